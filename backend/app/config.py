@@ -18,12 +18,101 @@ class Settings(BaseSettings):
     web_research_enabled: bool = True
     web_research_model: str = "perplexity/sonar-pro"
 
+    # Model registry
+    model_registry_ttl_seconds: int = 300
+    model_registry_realtime_enabled: bool = True
+
+    # Prompt token budgets (research/description are compressed to fit)
+    prompt_research_token_budget: int = 800
+    prompt_description_token_budget: int = 300
+
+    # Prediction cascade
+    cascade_enabled: bool = True
+    cascade_extreme_price: float = 0.03
+    cascade_min_hours_to_end: float = 1.0
+    cascade_screen_model: str = "gemini"
+    cascade_min_edge: float = 0.05
+    cascade_model_call_cost_usd: float = 0.01
+    cascade_research_cost_usd: float = 0.02
+    cascade_skip_retry_hours: float = 24.0
+
+    # Batched screening (several markets per screening request)
+    batch_screen_enabled: bool = True
+    batch_screen_size: int = 10
+    batch_screen_max_prompt_tokens: int = 6000
+    batch_screen_tokens_per_market: int = 150
+
+    # Near-duplicate question reuse
+    similar_research_reuse_enabled: bool = True
+    similar_research_threshold: float = 0.9
+    similar_research_max_age_hours: float = 12.0
+
+    # Event-level batching of sibling markets (same event_slug)
+    event_batching_enabled: bool = True
+    event_batch_max_markets: int = 20
+    event_tokens_per_market: int = 200
+
+    # LLM budget governor (llm_daily_budget_usd <= 0 disables the dollar limit,
+    # TPM limits <= 0 disable rate limiting; TPM keys are OpenRouter model ids)
+    llm_daily_budget_usd: float = 0
+    llm_lane_shares: dict[str, float] = {"manual": 0.3, "backlog": 0.5, "reprediction": 0.2}
+    llm_model_tpm_limits: dict[str, int] = {}
+    llm_default_tpm_limit: int = 0
+    llm_budget_min_models: int = 1
+
     # App
     log_level: str = "INFO"
     market_poll_interval_minutes: int = 5
     odds_update_interval_minutes: int = 1
-    resolution_check_interval_minutes: int = 60
+    resolution_check_interval_minutes: int = 10
     trader_scan_interval_minutes: int = 30
+    telemetry_flush_interval_seconds: int = 30
+
+    # Calibration-weighted consensus (weighted results are always logged;
+    # this switches the stored consensus over to them)
+    calibration_weighting_enabled: bool = False
+    calibration_min_samples: int = 30
+    calibration_prior_strength: float = 20.0
+
+    # Resolution scheduling
+    resolution_lookahead_hours: float = 1.0
+    resolution_max_checks_per_cycle: int = 200
+    resolution_check_concurrency: int = 8
+    resolution_backoff_base_minutes: int = 15
+    resolution_backoff_max_hours: int = 24
+    resolution_feed_enabled: bool = True
+    resolution_feed_page_size: int = 500
+    resolution_feed_max_pages: int = 20
+    resolution_feed_initial_lookback_days: int = 30
+
+    # Tracked-trader refresh
+    trader_refresh_concurrency: int = 8
+    trade_page_size: int = 200
+    trade_max_pages: int = 10
+    trade_backfill_max_pages: int = 200
+    trade_insert_chunk_size: int = 500
+    trader_counter_reconcile_interval_hours: int = 24
+
+    # Leaderboard scan (every category x period board is fetched concurrently;
+    # a wallet on several boards takes its leaderboard stats from the earliest
+    # period listed, then the earliest category)
+    trader_scan_categories: list[str] = ["OVERALL"]
+    trader_scan_periods: list[str] = ["ALL", "MONTH"]
+    trader_scan_limit: int = 10
+
+    # Odds history
+    odds_history_min_move: float = 0.001
+    odds_history_raw_retention_days: int = 2
+    odds_history_minute_retention_days: int = 14
+    odds_history_hour_retention_days: int = 180
+    odds_history_prune_interval_hours: int = 6
+
+    # Re-prediction scheduler
+    reprediction_interval_minutes: int = 30
+    reprediction_per_cycle: int = 10
+    reprediction_min_score: float = 2.0
+    reprediction_min_age_hours: float = 6.0
+    reprediction_stale_hours: float = 72.0
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -3,6 +3,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.services.model_registry import start_registry_listener, stop_registry_listener
+from app.services.telemetry import flush_telemetry
 from app.utils.logger import setup_logging, log
 from app.workers.scheduler import start_scheduler, stop_scheduler
 
@@ -12,8 +14,11 @@ async def lifespan(app: FastAPI):
     setup_logging()
     log.info("app_starting")
     start_scheduler()
+    await start_registry_listener()
     yield
+    await stop_registry_listener()
     stop_scheduler()
+    await flush_telemetry()
     log.info("app_stopped")
 
 
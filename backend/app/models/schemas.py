@@ -29,12 +29,18 @@ class LlmModelCreate(BaseModel):
     name: str
     display_name: str
     openrouter_id: str
+    supports_structured_output: bool = False
+    input_cost_per_mtok: float | None = None
+    output_cost_per_mtok: float | None = None
 
 
 class LlmModelUpdate(BaseModel):
     display_name: str | None = None
     openrouter_id: str | None = None
     enabled: bool | None = None
+    supports_structured_output: bool | None = None
+    input_cost_per_mtok: float | None = None
+    output_cost_per_mtok: float | None = None
 
 
 class LlmModelResponse(BaseModel):
@@ -43,11 +49,53 @@ class LlmModelResponse(BaseModel):
     display_name: str
     openrouter_id: str
     enabled: bool
+    supports_structured_output: bool = False
+    input_cost_per_mtok: float | None = None
+    output_cost_per_mtok: float | None = None
     created_at: datetime | None = None
 
     model_config = {"from_attributes": True}
 
 
+class ModelCalibration(BaseModel):
+    model_name: str
+    samples: int = 0
+    weight: float = 1
+    skill: float = 0
+    raw_brier: float | None = None
+    curve: list[float] = []
+
+
+class ModelFormatStats(BaseModel):
+    model_id: str
+    calls: int = 0
+    requests: int = 0
+    recovered: int = 0
+    parse_failures: int = 0
+    parse_failure_rate: float = 0
+    recovered_rate: float = 0
+    re_request_rate: float = 0
+
+
+class ModelStats(BaseModel):
+    model_name: str
+    window_hours: int
+    calls: int = 0
+    errors: int = 0
+    avg_attempts: float = 0
+    p50_latency_ms: int = 0
+    p95_latency_ms: int = 0
+    p99_latency_ms: int = 0
+    avg_latency_ms: int = 0
+    avg_queue_ms: int = 0
+    calls_per_hour: float = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    total_cost: float = 0
+    cost_per_call: float = 0
+
+
 # --- Market ---
 
 class MarketBase(BaseModel):
@@ -82,6 +130,30 @@ class MarketResponse(MarketBase):
     model_config = {"from_attributes": True}
 
 
+class SimilarMarket(BaseModel):
+    id: str
+    question: str
+    similarity: float
+    status: MarketStatus = MarketStatus.ACTIVE
+    end_date: datetime | None = None
+    web_research_at: datetime | None = None
+
+
+class OddsPoint(BaseModel):
+    t: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    samples: int = 1
+
+
+class OddsHistory(BaseModel):
+    market_id: str
+    resolution: str
+    points: list[OddsPoint] = []
+
+
 class MarketDetail(MarketResponse):
     predictions: list[PredictionResponse] = Field(default_factory=list)
     consensus: ConsensusResponse | None = None
@@ -131,6 +203,11 @@ class ConsensusCreate(ConsensusBase):
 
 class ConsensusResponse(ConsensusBase):
     id: str
+    prediction_odds: float | None = None
+    ai_probability: float | None = None
+    ev: float | None = None
+    edge: float | None = None
+    predicted_at: datetime | None = None
     pnl: float | None = None
     is_correct: bool | None = None
     resolved_at: datetime | None = None
@@ -152,6 +229,19 @@ class PerformanceSummary(BaseModel):
     avg_confidence: float = 0
 
 
+class CategoryPerformance(BaseModel):
+    category: str
+    total_predictions: int = 0
+    correct: int = 0
+    incorrect: int = 0
+    no_trade: int = 0
+    accuracy_pct: float = 0
+    avg_confidence: float = 0
+    scored: int = 0
+    brier_score: float | None = None
+    log_loss: float | None = None
+
+
 class ModelPerformance(BaseModel):
     model_name: str
     total_predictions: int = 0
@@ -160,12 +250,44 @@ class ModelPerformance(BaseModel):
     no_trade: int = 0
     accuracy_pct: float = 0
     avg_confidence: float = 0
+    scored: int = 0
+    brier_score: float | None = None
+    log_loss: float | None = None
+    by_category: list[CategoryPerformance] = []
 
 
 class PnlPoint(BaseModel):
     date: str
     cumulative_pnl: float
     daily_pnl: float
+    period_pnl: float = 0
+    resolved: int = 0
+
+
+class BacktestStrategy(BaseModel):
+    consensus: str = "plurality"
+    sizing: str = "edge_linear"
+    min_edge: float = 0
+    consensus_params: dict = {}
+    sizing_params: dict = {}
+    name: str = ""
+
+
+class BacktestRequest(BaseModel):
+    strategies: list[BacktestStrategy] = []
+    grid: bool = False
+    refresh: bool = False
+    top: int = Field(50, ge=1, le=1000)
+
+
+class BacktestResult(BaseModel):
+    strategy: str
+    trades: int = 0
+    accuracy_pct: float = 0
+    total_pnl: float = 0
+    roi_pct: float = 0
+    max_drawdown: float = 0
+    brier_score: float | None = None
 
 
 # --- Traders ---
@@ -192,9 +314,17 @@ class TrackedTraderResponse(BaseModel):
     pnl: float = 0
     volume: float = 0
     rank: int | None = None
+    leaderboard_pnl: float | None = None
+    leaderboard_volume: float | None = None
+    leaderboard_period: str | None = None
     category: str = "OVERALL"
     auto_discovered: bool = False
     last_refreshed_at: datetime | None = None
+    last_trade_at: datetime | None = None
+    backfilled_at: datetime | None = None
+    trade_count: int = 0
+    active_markets: int = 0
+    trade_volume: float = 0
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
@@ -221,8 +351,6 @@ class TraderTradeResponse(BaseModel):
 
 class TraderDetailResponse(TrackedTraderResponse):
     trades: list[TraderTradeResponse] = Field(default_factory=list)
-    trade_count: int = 0
-    active_markets: int = 0
 
 
 class TraderActivityResponse(BaseModel):
@@ -263,6 +391,28 @@ class TraderStatsResponse(BaseModel):
     top_trader: str | None = None
 
 
+class TraderRefreshResult(BaseModel):
+    trader_id: str
+    proxy_wallet: str
+    ok: bool = True
+    new_trades: int = 0
+    elapsed_ms: int = 0
+
+
+class TraderRefreshJob(BaseModel):
+    id: str
+    source: str = "api"
+    status: str = "running"
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    elapsed_ms: int = 0
+    error: str | None = None
+    results: list[TraderRefreshResult] = []
+
+
 # --- Health ---
 
 class HealthResponse(BaseModel):
@@ -1,6 +1,8 @@
+from datetime import datetime, timedelta, timezone
+
 from fastapi import APIRouter, Query, HTTPException
 from app.database import supabase
-from app.models.schemas import MarketResponse, MarketDetail
+from app.models.schemas import MarketResponse, MarketDetail, OddsHistory, SimilarMarket
 from app.utils.logger import log
 
 router = APIRouter(tags=["markets"])
@@ -50,6 +52,54 @@ async def get_market(market_id: str):
     return data
 
 
+@router.get("/markets/{market_id}/similar", response_model=list[SimilarMarket])
+async def similar_markets(
+    market_id: str,
+    threshold: float = Query(0.7, ge=0, le=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    from app.services.question_index import find_similar
+
+    market = supabase.table("markets").select("id, question").eq("id", market_id).limit(1).execute()
+    if not market.data:
+        raise HTTPException(status_code=404, detail="Market not found")
+
+    matches = find_similar(market.data[0]["question"], threshold=threshold, limit=limit, exclude_id=market_id)
+    if not matches:
+        return []
+    similarity = dict(matches)
+    rows = (
+        supabase.table("markets")
+        .select("id, question, status, end_date, web_research_at")
+        .in_("id", list(similarity))
+        .execute()
+    )
+    results = [{**row, "similarity": similarity[row["id"]]} for row in rows.data or []]
+    return sorted(results, key=lambda r: -r["similarity"])
+
+
+@router.get("/markets/{market_id}/odds-history", response_model=OddsHistory)
+async def odds_history(
+    market_id: str,
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    resolution: str | None = Query(None, pattern="^(raw|1m|1h|1d)$"),
+    max_points: int = Query(500, ge=10, le=5000),
+):
+    from app.services.odds_history import get_odds_history
+
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+
+    return get_odds_history(market_id, start, end, resolution=resolution, max_points=max_points)
+
+
 @router.post("/markets/refresh")
 async def refresh_markets():
     from app.workers.market_poller import poll_markets
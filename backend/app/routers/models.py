@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query
 from app.database import supabase
-from app.models.schemas import LlmModelCreate, LlmModelUpdate, LlmModelResponse
+from app.models.schemas import (
+    LlmModelCreate,
+    LlmModelUpdate,
+    LlmModelResponse,
+    ModelCalibration,
+    ModelFormatStats,
+    ModelStats,
+)
+from app.services import model_registry
 from app.utils.logger import log
 
 router = APIRouter(tags=["models"])
@@ -15,11 +23,33 @@ async def list_models(enabled: bool | None = None):
     return result.data
 
 
+@router.get("/models/stats", response_model=list[ModelStats])
+async def model_stats(hours: int = Query(24, ge=1, le=24 * 30)):
+    from app.services.telemetry import get_model_stats
+
+    return await get_model_stats(hours)
+
+
+@router.get("/models/format-stats", response_model=list[ModelFormatStats])
+async def model_format_stats():
+    from app.services.llm_predictor import get_format_stats
+
+    return [{"model_id": model_id, **stats} for model_id, stats in get_format_stats().items()]
+
+
+@router.get("/models/calibration", response_model=list[ModelCalibration])
+async def model_calibration():
+    from app.services.calibration import get_calibration
+
+    return get_calibration()
+
+
 @router.post("/models", response_model=LlmModelResponse, status_code=201)
 async def create_model(body: LlmModelCreate):
     try:
         result = supabase.table("llm_models").insert(body.model_dump()).execute()
         log.info("model_created", name=body.name)
+        model_registry.invalidate(reason="model_created")
         return result.data[0]
     except Exception as e:
         if "duplicate key" in str(e).lower():
@@ -42,6 +72,7 @@ async def update_model(model_id: str, body: LlmModelUpdate):
     if not result.data:
         raise HTTPException(status_code=404, detail="Model not found")
     log.info("model_updated", model_id=model_id, updates=updates)
+    model_registry.invalidate(reason="model_updated")
     return result.data[0]
 
 
@@ -56,4 +87,5 @@ async def delete_model(model_id: str):
     if not result.data:
         raise HTTPException(status_code=404, detail="Model not found")
     log.info("model_deleted", model_id=model_id)
+    model_registry.invalidate(reason="model_deleted")
     return {"status": "ok"}
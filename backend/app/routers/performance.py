@@ -1,6 +1,14 @@
-from fastapi import APIRouter
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Query
 from app.database import supabase
-from app.models.schemas import PerformanceSummary, ModelPerformance, PnlPoint
+from app.models.schemas import (
+    PerformanceSummary,
+    ModelPerformance,
+    PnlPoint,
+    BacktestRequest,
+    BacktestResult,
+)
 from app.services.performance_tracker import (
     compute_summary,
     compute_by_model,
@@ -21,5 +29,45 @@ async def performance_by_model():
 
 
 @router.get("/performance/pnl-history", response_model=list[PnlPoint])
-async def pnl_history():
-    return await compute_pnl_history()
+async def pnl_history(
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    granularity: str = Query("auto", pattern="^(auto|day|week|month)$"),
+    max_points: int = Query(365, ge=2, le=5000),
+):
+    if start and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return await compute_pnl_history(start, end, granularity, max_points)
+
+
+@router.post("/performance/backtest", response_model=list[BacktestResult])
+async def backtest(body: BacktestRequest):
+    from app.services.backtest import (
+        CONSENSUS_RULES,
+        SIZING_RULES,
+        Strategy,
+        get_backtest_data,
+        run_backtest,
+        strategy_grid,
+    )
+
+    strategies = strategy_grid() if body.grid else []
+    for spec in body.strategies:
+        if spec.consensus not in CONSENSUS_RULES:
+            raise HTTPException(status_code=400, detail=f"Unknown consensus rule: {spec.consensus}")
+        if spec.sizing not in SIZING_RULES:
+            raise HTTPException(status_code=400, detail=f"Unknown sizing rule: {spec.sizing}")
+        strategies.append(Strategy(**spec.model_dump()))
+    if not strategies:
+        strategies = [Strategy()]
+
+    try:
+        results = run_backtest(strategies, get_backtest_data(refresh=body.refresh))
+    except TypeError as e:
+        # Unknown keyword in consensus_params/sizing_params
+        raise HTTPException(status_code=400, detail=str(e))
+    return results[:body.top]
@@ -8,6 +8,7 @@ from app.models.schemas import (
     TraderActivityResponse,
     TraderPositionResponse,
     TraderStatsResponse,
+    TraderRefreshJob,
 )
 from app.services.trader_tracker import (
     fetch_leaderboard,
@@ -18,9 +19,10 @@ from app.services.trader_tracker import (
     get_tracked_traders,
     get_trader_detail,
     get_trader_trades,
+    refresh_trader,
     refresh_trader_trades,
-    refresh_trader_profile,
-    refresh_all_tracked_traders,
+    start_refresh_all_job,
+    get_refresh_job,
     get_stats_summary,
 )
 
@@ -63,10 +65,17 @@ async def untrack(trader_id: str):
     return {"status": "ok", "deleted": trader_id}
 
 
-@router.post("/traders/refresh-all")
+@router.post("/traders/refresh-all", response_model=TraderRefreshJob, status_code=202)
 async def refresh_all():
-    count = await refresh_all_tracked_traders()
-    return {"status": "ok", "refreshed": count}
+    return start_refresh_all_job()
+
+
+@router.get("/traders/refresh-all/{job_id}", response_model=TraderRefreshJob)
+async def refresh_all_status(job_id: str):
+    job = get_refresh_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job
 
 
 @router.get("/traders/stats/summary", response_model=TraderStatsResponse)
@@ -159,7 +168,14 @@ async def refresh(trader_id: str):
     detail = await get_trader_detail(trader_id, auto_fetch=False)
     if not detail:
         raise HTTPException(status_code=404, detail="Trader not found")
-    wallet = detail["proxy_wallet"]
-    await refresh_trader_profile(trader_id, wallet)
-    count = await refresh_trader_trades(trader_id, wallet)
-    return {"status": "ok", "trades_refreshed": count}
+    result = await refresh_trader(trader_id, detail["proxy_wallet"])
+    return {"status": "ok", "trades_refreshed": result["new_trades"], "elapsed_ms": result["elapsed_ms"]}
+
+
+@router.post("/traders/{trader_id}/backfill")
+async def backfill(trader_id: str):
+    detail = await get_trader_detail(trader_id, auto_fetch=False)
+    if not detail:
+        raise HTTPException(status_code=404, detail="Trader not found")
+    count = await refresh_trader_trades(trader_id, detail["proxy_wallet"], backfill=True)
+    return {"status": "ok", "trades_inserted": count}
@@ -0,0 +1,327 @@
+"""Offline replay of consensus and sizing strategies over resolved markets.
+
+Usage from the command line:
+
+    python -m app.services.backtest --grid --top 20
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.database import supabase
+from app.services.consensus_engine import _VOTE_CODES, score_votes
+from app.utils.logger import log
+
+_PAGE = 1000
+_IN_CHUNK = 200
+_CACHE_SECONDS = 300
+
+_YES, _NO, _NONE = 0, 1, 2
+
+
+@dataclass
+class BacktestData:
+    """Resolved markets and their stored predictions as columnar arrays.
+
+    Market arrays are ordered by resolution time; prediction arrays hold one
+    entry per valid prediction, pointing into the market arrays via pred_market.
+    """
+    market_ids: list[str]
+    outcome_yes: np.ndarray
+    yes_price: np.ndarray
+    models: list[str]
+    pred_market: np.ndarray
+    pred_model: np.ndarray
+    pred_vote: np.ndarray
+    pred_conf: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.market_ids)
+
+
+@dataclass
+class Strategy:
+    consensus: str = "plurality"
+    sizing: str = "edge_linear"
+    min_edge: float = 0.0
+    consensus_params: dict = field(default_factory=dict)
+    sizing_params: dict = field(default_factory=dict)
+    name: str = ""
+
+    def __post_init__(self):
+        if not self.name:
+            parts = [self.consensus, *(f"{k}={v}" for k, v in sorted(self.consensus_params.items()))]
+            parts += [self.sizing, *(f"{k}={v}" for k, v in sorted(self.sizing_params.items()))]
+            parts.append(f"min_edge={self.min_edge:g}")
+            self.name = "/".join(parts)
+
+
+# --- Consensus rules: (data, **params) -> (side, p_yes) per market ---
+
+def _model_mask(data: BacktestData, models: list[str] | None) -> np.ndarray:
+    if not models:
+        return np.ones(len(data.pred_model), dtype=bool)
+    codes = [data.models.index(m) for m in models if m in data.models]
+    return np.isin(data.pred_model, codes)
+
+
+def plurality(data: BacktestData, models: list[str] | None = None):
+    """The live rule: NO_TRADE plurality wins, else YES/NO majority with confidence tie-break."""
+    mask = _model_mask(data, models)
+    s = score_votes(
+        data.pred_market[mask], data.pred_vote[mask], data.pred_conf[mask],
+        data.yes_price, 1 - data.yes_price,
+    )
+    side = np.where(s["total"] > 0, s["decision"], _NONE)
+    return side, s["ai_probability"]
+
+
+def unanimous(data: BacktestData, models: list[str] | None = None):
+    """Trade only when every valid vote picks the same side."""
+    mask = _model_mask(data, models)
+    s = score_votes(
+        data.pred_market[mask], data.pred_vote[mask], data.pred_conf[mask],
+        data.yes_price, 1 - data.yes_price,
+    )
+    side = np.where((s["total"] > 0) & (s["agreement_ratio"] >= 1.0), s["decision"], _NONE)
+    return side, s["ai_probability"]
+
+
+def mean_probability(data: BacktestData, models: list[str] | None = None):
+    """Average the models' YES probabilities and take whichever side the price undervalues."""
+    mask = _model_mask(data, models) & (data.pred_vote != _NONE)
+    p_yes_each = np.where(data.pred_vote[mask] == _YES, data.pred_conf[mask], 1 - data.pred_conf[mask])
+    n = len(data)
+    counts = np.bincount(data.pred_market[mask], minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_yes = np.bincount(data.pred_market[mask], weights=p_yes_each, minlength=n) / counts
+    side = np.where(counts == 0, _NONE, np.where(p_yes > data.yes_price, _YES, _NO))
+    return side, p_yes
+
+
+CONSENSUS_RULES = {
+    "plurality": plurality,
+    "unanimous": unanimous,
+    "mean_probability": mean_probability,
+}
+
+
+# --- Sizing rules: (p_side, price, edge, **params) -> stake per market ---
+
+def edge_linear(p_side, price, edge, scale: float = 200):
+    """The live rule: stake proportional to positive edge."""
+    return np.round(np.maximum(edge, 0) * scale, 2)
+
+
+def flat(p_side, price, edge, stake: float = 10):
+    return np.full(len(price), float(stake))
+
+
+def kelly(p_side, price, edge, fraction: float = 0.25, bankroll: float = 1000):
+    """Fractional Kelly on a binary contract bought at price."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.nan_to_num((p_side - price) / (1 - price))
+    return np.round(np.maximum(f, 0) * fraction * bankroll, 2)
+
+
+SIZING_RULES = {
+    "edge_linear": edge_linear,
+    "flat": flat,
+    "kelly": kelly,
+}
+
+
+def strategy_grid() -> list[Strategy]:
+    """Default sweep: every consensus rule x sizing rule over a range of edge thresholds."""
+    sizings = [
+        ("edge_linear", {"scale": 100}), ("edge_linear", {"scale": 200}), ("edge_linear", {"scale": 400}),
+        ("flat", {"stake": 10}),
+        ("kelly", {"fraction": 0.1}), ("kelly", {"fraction": 0.25}), ("kelly", {"fraction": 0.5}),
+    ]
+    return [
+        Strategy(consensus=consensus, sizing=sizing, min_edge=round(min_edge, 2), sizing_params=params)
+        for consensus in CONSENSUS_RULES
+        for sizing, params in sizings
+        for min_edge in np.arange(0, 0.21, 0.01)
+    ]
+
+
+def _outcome_yes(outcome: str) -> bool | None:
+    normalized = (outcome or "").strip().upper()
+    if normalized in ("YES", "Y"):
+        return True
+    if normalized in ("NO", "N"):
+        return False
+    return None
+
+
+def _entry_yes_price(row: dict) -> float | None:
+    """YES price at prediction time: the bet price when one was placed, else the snapshot."""
+    bet_odds = row.get("bet_odds") or 0
+    if bet_odds > 0 and row.get("final_decision") == "YES":
+        return bet_odds
+    if bet_odds > 0 and row.get("final_decision") == "NO":
+        return 1 - bet_odds
+    return row.get("prediction_odds")
+
+
+def load_backtest_data() -> BacktestData:
+    """Load resolved consensus rows with their market outcome and predictions."""
+    rows = []
+    offset = 0
+    while True:
+        page = (
+            supabase.table("consensus")
+            .select("market_id, final_decision, bet_odds, prediction_odds, resolved_at, markets!inner(outcome)")
+            .not_.is_("resolved_at", "null")
+            .order("resolved_at", desc=False)
+            .range(offset, offset + _PAGE - 1)
+            .execute()
+        )
+        rows.extend(page.data or [])
+        if len(page.data or []) < _PAGE:
+            break
+        offset += _PAGE
+
+    market_ids, outcomes, prices = [], [], []
+    for row in rows:
+        outcome = _outcome_yes((row.get("markets") or {}).get("outcome"))
+        price = _entry_yes_price(row)
+        if outcome is None or not price or not 0 < price < 1:
+            continue
+        market_ids.append(row["market_id"])
+        outcomes.append(outcome)
+        prices.append(price)
+
+    index = {market_id: i for i, market_id in enumerate(market_ids)}
+    models: list[str] = []
+    pred_market, pred_model, pred_vote, pred_conf = [], [], [], []
+    for start in range(0, len(market_ids), _IN_CHUNK):
+        result = (
+            supabase.table("predictions")
+            .select("market_id, model_name, prediction, confidence, error")
+            .in_("market_id", market_ids[start:start + _IN_CHUNK])
+            .execute()
+        )
+        for p in result.data or []:
+            if p.get("error") or p.get("prediction") not in _VOTE_CODES:
+                continue
+            if p["model_name"] not in models:
+                models.append(p["model_name"])
+            pred_market.append(index[p["market_id"]])
+            pred_model.append(models.index(p["model_name"]))
+            pred_vote.append(_VOTE_CODES[p["prediction"]])
+            pred_conf.append(p.get("confidence") or 0)
+
+    return BacktestData(
+        market_ids=market_ids,
+        outcome_yes=np.array(outcomes, dtype=bool),
+        yes_price=np.array(prices, dtype=np.float64),
+        models=models,
+        pred_market=np.array(pred_market, dtype=np.int64),
+        pred_model=np.array(pred_model, dtype=np.int64),
+        pred_vote=np.array(pred_vote, dtype=np.int64),
+        pred_conf=np.array(pred_conf, dtype=np.float64),
+    )
+
+
+_cached: BacktestData | None = None
+_cached_at = 0.0
+
+
+def get_backtest_data(refresh: bool = False) -> BacktestData:
+    global _cached, _cached_at
+
+    if refresh or _cached is None or time.monotonic() - _cached_at > _CACHE_SECONDS:
+        _cached = load_backtest_data()
+        _cached_at = time.monotonic()
+        log.info("backtest_data_loaded", markets=len(_cached), predictions=len(_cached.pred_market))
+    return _cached
+
+
+def _evaluate(data: BacktestData, strategy: Strategy, side: np.ndarray, p_yes: np.ndarray) -> dict:
+    price = np.where(side == _YES, data.yes_price, 1 - data.yes_price)
+    p_side = np.where(side == _YES, p_yes, 1 - p_yes)
+    edge = np.nan_to_num(p_side - price, nan=-1.0)
+
+    traded = (side != _NONE) & (edge >= strategy.min_edge)
+    stake = SIZING_RULES[strategy.sizing](p_side, price, edge, **strategy.sizing_params)
+    stake = np.where(traded, stake, 0.0)
+    traded &= stake > 0
+
+    correct = np.where(side == _YES, data.outcome_yes, ~data.outcome_yes)
+    pnl = np.where(traded, np.where(correct, stake * (1 / price - 1), -stake), 0.0)
+
+    cumulative = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([0.0], cumulative)))[1:]
+    max_drawdown = float((peak - cumulative).max()) if len(cumulative) else 0.0
+
+    scored = ~np.isnan(p_yes)
+    brier = float(np.mean((p_yes[scored] - data.outcome_yes[scored]) ** 2)) if scored.any() else None
+
+    trades = int(traded.sum())
+    staked = float(stake[traded].sum())
+    total_pnl = float(pnl.sum())
+    return {
+        "strategy": strategy.name,
+        "trades": trades,
+        "accuracy_pct": round(100 * float(correct[traded].mean()), 2) if trades else 0,
+        "total_pnl": round(total_pnl, 2),
+        "roi_pct": round(100 * total_pnl / staked, 2) if staked else 0,
+        "max_drawdown": round(max_drawdown, 2),
+        "brier_score": round(brier, 4) if brier is not None else None,
+    }
+
+
+def run_backtest(strategies: list[Strategy], data: BacktestData | None = None) -> list[dict]:
+    """Replay strategies over resolved markets, best total P&L first.
+
+    Each distinct consensus rule/params pair is evaluated once and shared by
+    every sizing variant that uses it.
+    """
+    data = data if data is not None else get_backtest_data()
+    if not len(data):
+        return []
+
+    started = time.monotonic()
+    consensus_cache: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+    results = []
+    for strategy in strategies:
+        key = (strategy.consensus, tuple(sorted((k, str(v)) for k, v in strategy.consensus_params.items())))
+        if key not in consensus_cache:
+            consensus_cache[key] = CONSENSUS_RULES[strategy.consensus](data, **strategy.consensus_params)
+        results.append(_evaluate(data, strategy, *consensus_cache[key]))
+
+    log.info(
+        "backtest_complete",
+        strategies=len(strategies),
+        markets=len(data),
+        elapsed_ms=int((time.monotonic() - started) * 1000),
+    )
+    return sorted(results, key=lambda r: -r["total_pnl"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backtest consensus/sizing strategies on resolved markets")
+    parser.add_argument("--grid", action="store_true", help="sweep the default strategy grid")
+    parser.add_argument("--consensus", default="plurality", choices=sorted(CONSENSUS_RULES))
+    parser.add_argument("--sizing", default="edge_linear", choices=sorted(SIZING_RULES))
+    parser.add_argument("--min-edge", type=float, default=0.0)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    strategies = strategy_grid() if args.grid else [
+        Strategy(consensus=args.consensus, sizing=args.sizing, min_edge=args.min_edge)
+    ]
+    header = f"{'strategy':<60} {'trades':>7} {'acc%':>7} {'pnl':>10} {'roi%':>8} {'maxDD':>9} {'brier':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in run_backtest(strategies)[:args.top]:
+        brier = f"{r['brier_score']:.4f}" if r["brier_score"] is not None else "-"
+        print(
+            f"{r['strategy']:<60} {r['trades']:>7} {r['accuracy_pct']:>7.2f} {r['total_pnl']:>10.2f} "
+            f"{r['roi_pct']:>8.2f} {r['max_drawdown']:>9.2f} {brier:>7}"
+        )
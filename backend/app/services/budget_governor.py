@@ -0,0 +1,209 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import supabase
+from app.services.model_registry import get_enabled_model_rows
+from app.utils.checkpoints import get_checkpoint, set_checkpoint
+from app.utils.logger import log
+
+# Completion tokens assumed per prediction call when estimating cost up front
+EST_COMPLETION_TOKENS = 300
+
+# Telemetry has no lane column, so per-lane spend is persisted separately
+_LANE_CHECKPOINT = "budget_lane_spent"
+
+
+@dataclass
+class BudgetPlan:
+    models: list[str]
+    research: bool
+    defer: bool = False
+    reserved: float = 0.0
+    dropped: list[str] = field(default_factory=list)
+
+
+class _TokenBucket:
+    """Tokens-per-minute limiter; debt from under-estimates is repaid from later refills."""
+
+    def __init__(self, tpm: int):
+        self.capacity = float(tpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        # Oversized requests only wait for a full bucket instead of forever
+        tokens = min(float(tokens), self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) * 60 / self.capacity)
+
+    def adjust(self, delta: int):
+        self._refill()
+        self.tokens -= delta
+
+
+_day: str = ""
+_spent: float = 0.0
+_lane_spent: dict[str, float] = {}
+_buckets: dict[str, _TokenBucket] = {}
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _roll_day():
+    """Reset counters at UTC midnight; on first use seed today's spend.
+
+    The global total comes from telemetry, per-lane totals from the
+    checkpoint written by reconcile().
+    """
+    global _day, _spent, _lane_spent
+
+    today = _today()
+    if _day == today:
+        return
+    first_load = not _day
+    _day, _spent, _lane_spent = today, 0.0, {}
+    if first_load:
+        try:
+            result = (
+                supabase.table("llm_telemetry_hourly")
+                .select("cost")
+                .gte("bucket_start", f"{today}T00:00:00+00:00")
+                .execute()
+            )
+            _spent = sum(row.get("cost") or 0 for row in (result.data or []))
+        except Exception as e:
+            log.warning("budget_seed_error", error=str(e))
+        try:
+            saved = json.loads(get_checkpoint(_LANE_CHECKPOINT) or "{}")
+            if saved.get("day") == today:
+                _lane_spent = {lane: float(v) for lane, v in saved.get("lanes", {}).items()}
+        except (ValueError, TypeError, AttributeError) as e:
+            log.warning("budget_lane_seed_error", error=str(e))
+
+
+def _lane_limit(lane: str) -> float:
+    share = settings.llm_lane_shares.get(lane, 1.0)
+    return settings.llm_daily_budget_usd * share
+
+
+def remaining(lane: str) -> float:
+    """Dollars left today for a lane (bounded by the global daily limit)."""
+    if settings.llm_daily_budget_usd <= 0:
+        return float("inf")
+    _roll_day()
+    return max(
+        min(
+            settings.llm_daily_budget_usd - _spent,
+            _lane_limit(lane) - _lane_spent.get(lane, 0.0),
+        ),
+        0.0,
+    )
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int = EST_COMPLETION_TOKENS) -> float:
+    """Dollar estimate from llm_models per-million-token prices, or the flat per-call default."""
+    row = get_enabled_model_rows().get(model_name) or {}
+    input_price = row.get("input_cost_per_mtok")
+    output_price = row.get("output_cost_per_mtok")
+    if input_price is None or output_price is None:
+        return settings.cascade_model_call_cost_usd
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def actual_cost(model_name: str, usage: dict | None) -> float | None:
+    """Provider-reported cost, else cost from reported tokens, else None."""
+    if not usage:
+        return None
+    if usage.get("cost") is not None:
+        return usage["cost"]
+    if usage.get("prompt_tokens") is None:
+        return None
+    return estimate_cost(model_name, usage["prompt_tokens"], usage.get("completion_tokens") or 0)
+
+
+def plan(lane: str, model_names: list[str], est_prompt_tokens: int, research: bool = True) -> BudgetPlan:
+    """Fit one market's work into the lane's remaining budget and reserve it.
+
+    Degrades in order: drop research, drop the most expensive models (keeping
+    at least llm_budget_min_models), then defer the market entirely.
+    """
+    costs = {name: estimate_cost(name, est_prompt_tokens) for name in model_names}
+    research_cost = settings.cascade_research_cost_usd if research else 0.0
+    left = remaining(lane)
+
+    chosen = sorted(model_names, key=lambda n: costs[n])
+    dropped: list[str] = []
+    total = research_cost + sum(costs.values())
+    if total > left and research:
+        research, total = False, total - research_cost
+    while total > left and len(chosen) > settings.llm_budget_min_models:
+        name = chosen.pop()
+        dropped.append(name)
+        total -= costs[name]
+
+    if total > left or not chosen:
+        log.info("budget_deferred", lane=lane, remaining=round(left, 4), needed=round(total, 4))
+        return BudgetPlan(models=[], research=False, defer=True)
+
+    reserve(lane, total)
+    if dropped or not research:
+        log.info(
+            "budget_degraded",
+            lane=lane,
+            remaining=round(left, 4),
+            dropped=dropped,
+            research=research,
+        )
+    return BudgetPlan(models=[n for n in model_names if n in chosen], research=research, reserved=total, dropped=dropped)
+
+
+def reserve(lane: str, amount: float):
+    global _spent
+    _roll_day()
+    _spent += amount
+    _lane_spent[lane] = _lane_spent.get(lane, 0.0) + amount
+
+
+def reconcile(lane: str, reserved: float, actual: float):
+    """Swap a reservation for the cost actually reported back and persist lane spend."""
+    reserve(lane, actual - reserved)
+    set_checkpoint(_LANE_CHECKPOINT, json.dumps({"day": _day, "lanes": _lane_spent}))
+
+
+def _bucket(model_id: str) -> _TokenBucket | None:
+    tpm = settings.llm_model_tpm_limits.get(model_id, settings.llm_default_tpm_limit)
+    if tpm <= 0:
+        return None
+    if model_id not in _buckets:
+        _buckets[model_id] = _TokenBucket(tpm)
+    return _buckets[model_id]
+
+
+async def acquire_tokens(model_id: str, est_tokens: int):
+    """Wait until the model's tokens-per-minute budget can cover est_tokens."""
+    bucket = _bucket(model_id)
+    if bucket is not None:
+        await bucket.acquire(est_tokens)
+
+
+def reconcile_tokens(model_id: str, est_tokens: int, actual_tokens: int | None):
+    bucket = _bucket(model_id)
+    if bucket is not None and actual_tokens is not None:
+        bucket.adjust(actual_tokens - est_tokens)
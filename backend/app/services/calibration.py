@@ -0,0 +1,237 @@
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.database import supabase
+from app.utils.logger import log
+
+# Confidence histogram resolution for the per-model calibration curves
+_BINS = 20
+_BIN_CENTERS = (np.arange(_BINS) + 0.5) / _BINS
+
+# Pseudo-observations per bin at the bin centre, so sparse bins stay near identity
+_BIN_PRIOR = 2.0
+
+# Floor so a badly calibrated model still gets a (small) vote
+_MIN_WEIGHT = 0.05
+
+_PAGE = 1000
+_IN_CHUNK = 200
+
+# After a failed history load, consensus runs uncalibrated this long before retrying
+_RETRY_SECONDS = 300
+
+
+class _ModelStats:
+    """Resolved (predicted YES probability, outcome) counts for one model."""
+
+    def __init__(self):
+        self.n = np.zeros(_BINS)
+        self.yes = np.zeros(_BINS)
+        self.sq_error = 0.0
+        self.curve = _BIN_CENTERS.copy()
+        self.skill = 0.0
+
+    @property
+    def samples(self) -> int:
+        return int(self.n.sum())
+
+    def add(self, p_yes: float, outcome_yes: bool):
+        b = _bin(p_yes)
+        self.n[b] += 1
+        self.yes[b] += outcome_yes
+        self.sq_error += (p_yes - outcome_yes) ** 2
+
+    def refit(self):
+        if self.samples < settings.calibration_min_samples:
+            self.curve = _BIN_CENTERS.copy()
+            self.skill = 0.0
+            return
+        weights = self.n + _BIN_PRIOR
+        self.curve = _isotonic((self.yes + _BIN_PRIOR * _BIN_CENTERS) / weights, weights)
+        # Brier skill of the calibrated curve against an uninformed 0.5 forecast
+        brier = float(
+            (self.yes * (1 - self.curve) ** 2 + (self.n - self.yes) * self.curve ** 2).sum() / self.samples
+        )
+        self.skill = 1 - brier / 0.25
+
+
+def _bin(p: float) -> int:
+    return min(max(int(p * _BINS), 0), _BINS - 1)
+
+
+def _isotonic(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Pool-adjacent-violators: weighted non-decreasing fit of values."""
+    blocks: list[list[float]] = []  # [mean, weight, length]
+    for v, w in zip(values, weights):
+        blocks.append([float(v), float(w), 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            v2, w2, l2 = blocks.pop()
+            v1, w1, l1 = blocks[-1]
+            blocks[-1] = [(v1 * w1 + v2 * w2) / (w1 + w2), w1 + w2, l1 + l2]
+    return np.concatenate([np.full(length, mean) for mean, _, length in blocks])
+
+
+_stats: dict[str, _ModelStats] = {}
+_weights: dict[str, float] = {}
+_loaded = False
+_load_failed_at: float | None = None
+
+
+def _p_yes(prediction: dict) -> float | None:
+    confidence = prediction.get("confidence") or 0
+    if prediction.get("prediction") == "YES":
+        return confidence
+    if prediction.get("prediction") == "NO":
+        return 1 - confidence
+    return None
+
+
+def _outcome_yes(outcome: str) -> bool | None:
+    normalized = (outcome or "").strip().upper()
+    if normalized in ("YES", "Y"):
+        return True
+    if normalized in ("NO", "N"):
+        return False
+    return None
+
+
+def _refresh_weights():
+    """Reliability weight per model: calibrated Brier skill, shrunk towards the
+    mean skill by calibration_prior_strength pseudo-samples."""
+    global _weights
+
+    fitted = [s for s in _stats.values() if s.samples >= settings.calibration_min_samples]
+    prior = float(np.mean([max(s.skill, _MIN_WEIGHT) for s in fitted])) if fitted else 1.0
+    k = settings.calibration_prior_strength
+    _weights = {
+        name: (s.samples * max(s.skill, _MIN_WEIGHT) + k * prior) / (s.samples + k)
+        for name, s in _stats.items()
+    }
+    _weights["__default__"] = prior
+
+
+def ensure_loaded():
+    """Fit all models from resolved history once per process; resolutions keep it current."""
+    global _loaded
+
+    if _loaded:
+        return
+
+    # A failed earlier attempt may have left partial counts behind
+    _stats.clear()
+    offset = 0
+    while True:
+        page = (
+            supabase.table("predictions")
+            .select("model_name, prediction, confidence, error, markets!inner(outcome)")
+            .not_.is_("markets.outcome", "null")
+            .order("created_at", desc=False)
+            .range(offset, offset + _PAGE - 1)
+            .execute()
+        )
+        rows = page.data or []
+        for row in rows:
+            _add(row, (row.get("markets") or {}).get("outcome"))
+        if len(rows) < _PAGE:
+            break
+        offset += _PAGE
+
+    for s in _stats.values():
+        s.refit()
+    _refresh_weights()
+    _loaded = True
+    log.info(
+        "calibration_loaded",
+        models={name: s.samples for name, s in _stats.items()},
+        weights={name: round(w, 3) for name, w in _weights.items()},
+    )
+
+
+def _add(prediction: dict, outcome: str) -> str | None:
+    outcome_yes = _outcome_yes(outcome)
+    p_yes = _p_yes(prediction)
+    if prediction.get("error") or outcome_yes is None or p_yes is None:
+        return None
+    name = prediction["model_name"]
+    _stats.setdefault(name, _ModelStats()).add(p_yes, outcome_yes)
+    return name
+
+
+def on_markets_resolved(outcomes: dict[str, str]):
+    """Fold resolved markets' predictions into the fits; called from resolve_markets.
+
+    outcomes maps market_id to the resolved outcome.
+    """
+    if not _loaded or not outcomes:
+        # The first ensure_loaded() will read these resolutions from the DB
+        return
+    try:
+        market_ids = list(outcomes)
+        touched = set()
+        for start in range(0, len(market_ids), _IN_CHUNK):
+            result = (
+                supabase.table("predictions")
+                .select("market_id, model_name, prediction, confidence, error")
+                .in_("market_id", market_ids[start:start + _IN_CHUNK])
+                .execute()
+            )
+            touched |= {_add(p, outcomes[p["market_id"]]) for p in result.data or []}
+        touched.discard(None)
+        for name in touched:
+            _stats[name].refit()
+        if touched:
+            _refresh_weights()
+    except Exception as e:
+        log.error("calibration_update_error", markets=len(outcomes), error=str(e))
+
+
+def adjust(model_names: list[str], votes: np.ndarray, confidences: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Calibrated confidences and reliability weights for a batch of predictions.
+
+    votes are coded YES=0, NO=1, NO_TRADE=2; NO_TRADE confidences pass through.
+    Each prediction is a curve and dict lookup.
+    """
+    calibrated = confidences.copy()
+    weights = np.empty(len(model_names))
+    default = _weights.get("__default__", 1.0)
+    for i, name in enumerate(model_names):
+        weights[i] = _weights.get(name, default)
+        stats = _stats.get(name)
+        if stats is None or votes[i] == 2:
+            continue
+        p_yes = confidences[i] if votes[i] == 0 else 1 - confidences[i]
+        p_cal = stats.curve[_bin(p_yes)]
+        calibrated[i] = p_cal if votes[i] == 0 else 1 - p_cal
+    return calibrated, weights
+
+
+def has_fits() -> bool:
+    global _load_failed_at
+
+    if not _loaded and _load_failed_at is not None and time.monotonic() - _load_failed_at < _RETRY_SECONDS:
+        return False
+    try:
+        ensure_loaded()
+    except Exception as e:
+        _load_failed_at = time.monotonic()
+        log.warning("calibration_load_error", error=str(e), retry_in_s=_RETRY_SECONDS)
+        return False
+    _load_failed_at = None
+    return any(s.samples >= settings.calibration_min_samples for s in _stats.values())
+
+
+def get_calibration() -> list[dict]:
+    ensure_loaded()
+    return [
+        {
+            "model_name": name,
+            "samples": s.samples,
+            "weight": round(_weights.get(name, 1.0), 4),
+            "skill": round(s.skill, 4),
+            "raw_brier": round(s.sq_error / s.samples, 4) if s.samples else None,
+            "curve": [round(float(v), 4) for v in s.curve],
+        }
+        for name, s in sorted(_stats.items())
+    ]
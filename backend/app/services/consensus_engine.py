@@ -1,21 +1,171 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.config import settings
 from app.database import supabase
+from app.services import calibration
+from app.utils.bulk import bulk_update
 from app.utils.logger import log
 
+_VOTE_CODES = {"YES": 0, "NO": 1, "NO_TRADE": 2}
+_DECISIONS = ("YES", "NO", "NO_TRADE")
 
-async def compute_consensus(market: dict, predictions: list[dict]) -> dict | None:
-    """Compute consensus from predictions and store in DB.
+# Bet sizing: dollars per unit of positive edge
+_BET_SCALE = 200
+
+# Columns the bulk recompute may rewrite. Entry terms (bet_odds, bet_amount)
+# only change together with final_decision, re-entered at the current price,
+# so a flipped decision is never settled at the other side's odds. The
+# prediction-time snapshot is left untouched.
+_BULK_FIELDS = ("final_decision", "avg_confidence", "agreement_ratio", "ai_probability", "current_odds", "ev", "edge")
+
+_IN_CHUNK = 200
+
+
+def score_votes(
+    market_idx: np.ndarray,
+    votes: np.ndarray,
+    confidences: np.ndarray,
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    weights: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Vectorised consensus over many markets at once.
+
+    market_idx/votes/confidences hold one entry per valid prediction (votes
+    coded by _VOTE_CODES); yes_prices/no_prices hold one entry per market.
+    With weights, votes and confidences count in proportion to each
+    prediction's weight instead of equally.
 
-    Logic:
+    Logic, per market:
     1. Count ALL votes including NO_TRADE
-    2. If NO_TRADE is the majority → NO_TRADE
-    3. Otherwise YES vs NO majority, then EV check
+    2. If NO_TRADE is the plurality → NO_TRADE
+    3. Otherwise YES vs NO majority (ties broken by summed confidence), then EV
     """
+    n = len(yes_prices)
+    slots = market_idx * 3 + votes
+    if weights is not None:
+        counts = np.bincount(slots, weights=weights, minlength=n * 3).reshape(n, 3)
+        confidences = confidences * weights
+    else:
+        counts = np.bincount(slots, minlength=n * 3).reshape(n, 3)
+    conf_sums = np.bincount(slots, weights=confidences, minlength=n * 3).reshape(n, 3)
+    yes_count, no_count, no_trade_count = counts[:, 0], counts[:, 1], counts[:, 2]
+    yes_conf, no_conf = conf_sums[:, 0], conf_sums[:, 1]
+    total = counts.sum(axis=1)
+
+    no_trade = (no_trade_count >= yes_count) & (no_trade_count >= no_count)
+    yes_major = (yes_count > no_count) | ((yes_count == no_count) & (yes_conf >= no_conf))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        majority_count = np.where(yes_major, yes_count, no_count)
+        directional = yes_count + no_count
+        avg_confidence = np.where(
+            no_trade,
+            np.nan_to_num(conf_sums.sum(axis=1) / total),
+            np.nan_to_num((yes_conf + no_conf) / directional),
+        )
+        agreement_ratio = np.nan_to_num(np.where(no_trade, no_trade_count, majority_count) / total)
+        # AI estimated probability for the majority direction
+        ai_majority = np.nan_to_num(np.where(yes_major, yes_conf / yes_count, no_conf / no_count))
+
+    # EV = (prob_AI × profit) - ((1 - prob_AI) × cost), priced on the majority side
+    market_price = np.where(yes_major, yes_prices, no_prices)
+    ev = ai_majority * (1 - market_price) - (1 - ai_majority) * market_price
+    edge = ai_majority - market_price
+
+    decision = np.where(no_trade, 2, np.where(yes_major, 0, 1))
+    return {
+        "decision": decision,
+        "avg_confidence": avg_confidence,
+        "agreement_ratio": agreement_ratio,
+        "ai_majority": ai_majority,
+        # Stored as the YES probability regardless of direction
+        "ai_probability": np.where(no_trade, np.nan, np.where(yes_major, ai_majority, 1 - ai_majority)),
+        "market_price": market_price,
+        "ev": np.where(no_trade, np.nan, ev),
+        "edge": np.where(no_trade, np.nan, edge),
+        "bet_odds": np.where(no_trade, 0.0, market_price),
+        "bet_amount": np.where(no_trade, 0.0, np.round(np.maximum(edge, 0) * _BET_SCALE, 2)),
+        "total": total,
+        "no_trade_count": no_trade_count,
+    }
+
+
+def _vote_arrays(
+    predictions_by_market: list[list[dict]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]:
+    market_idx, votes, confidences, models = [], [], [], []
+    for i, predictions in enumerate(predictions_by_market):
+        # Filter out only errors, keep NO_TRADE as a real vote
+        for p in predictions:
+            if p.get("error") or p.get("prediction") not in _VOTE_CODES:
+                continue
+            market_idx.append(i)
+            votes.append(_VOTE_CODES[p["prediction"]])
+            confidences.append(p.get("confidence") or 0)
+            models.append(p.get("model_name", ""))
+    return (
+        np.array(market_idx, dtype=np.int64),
+        np.array(votes, dtype=np.int64),
+        np.array(confidences, dtype=np.float64),
+        models,
+    )
+
+
+def _score(
+    predictions_by_market: list[list[dict]], yes_prices: np.ndarray, no_prices: np.ndarray
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray] | None]:
+    """Unweighted scores, plus calibration-weighted scores once model fits exist."""
+    market_idx, votes, confidences, models = _vote_arrays(predictions_by_market)
+    unweighted = score_votes(market_idx, votes, confidences, yes_prices, no_prices)
+    if not calibration.has_fits():
+        return unweighted, None
+    calibrated, weights = calibration.adjust(models, votes, confidences)
+    weighted = score_votes(market_idx, votes, calibrated, yes_prices, no_prices, weights=weights)
+    return unweighted, weighted
+
+
+def _prices(outcome_prices) -> tuple[float | None, float | None]:
+    outcome_prices = outcome_prices or []
+    yes_price = float(outcome_prices[0]) if len(outcome_prices) > 0 else None
+    no_price = float(outcome_prices[1]) if len(outcome_prices) > 1 else None
+    return yes_price, no_price
+
+
+def _opt(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+async def compute_consensus(market: dict, predictions: list[dict]) -> dict | None:
+    """Compute consensus from predictions and store in DB (single-market score_votes)."""
     market_id = market["id"]
+    predicted_at = datetime.now(timezone.utc).isoformat()
+    yes_price, no_price = _prices(market.get("outcome_prices"))
 
-    # Filter out only errors, keep NO_TRADE as a real vote
-    valid = [p for p in predictions if not p.get("error")]
+    unweighted, weighted = _score(
+        [predictions],
+        np.array([yes_price if yes_price is not None else 0.5]),
+        np.array([no_price if no_price is not None else 0.5]),
+    )
+    u = {key: value[0] for key, value in unweighted.items()}
+    if weighted is not None:
+        w = {key: value[0] for key, value in weighted.items()}
+        log.info(
+            "consensus_weighting",
+            market_id=market_id,
+            applied=settings.calibration_weighting_enabled,
+            unweighted_decision=_DECISIONS[u["decision"]],
+            weighted_decision=_DECISIONS[w["decision"]],
+            unweighted_ai_probability=_opt(u["ai_probability"]),
+            weighted_ai_probability=_opt(w["ai_probability"]),
+            unweighted_edge=_opt(u["edge"]),
+            weighted_edge=_opt(w["edge"]),
+        )
+    s = w if weighted is not None and settings.calibration_weighting_enabled else u
 
-    if not valid:
+    if not u["total"]:
         consensus_row = {
             "market_id": market_id,
             "final_decision": "NO_TRADE",
@@ -24,126 +174,67 @@ async def compute_consensus(market: dict, predictions: list[dict]) -> dict | Non
             "bet_amount": 0,
             "bet_odds": 0,
             "current_odds": 0,
+            "prediction_odds": None,
+            "ai_probability": None,
+            "ev": None,
+            "edge": None,
+            "predicted_at": predicted_at,
         }
         return _upsert_consensus(consensus_row)
 
-    # Count all three categories
-    yes_votes = [p for p in valid if p["prediction"] == "YES"]
-    no_votes = [p for p in valid if p["prediction"] == "NO"]
-    no_trade_votes = [p for p in valid if p["prediction"] == "NO_TRADE"]
-
-    total_valid = len(valid)
-    yes_count = len(yes_votes)
-    no_count = len(no_votes)
-    no_trade_count = len(no_trade_votes)
-
-    # If NO_TRADE is the plurality → NO_TRADE immediately
-    if no_trade_count >= yes_count and no_trade_count >= no_count:
-        all_confidences = [p.get("confidence", 0) for p in valid]
-        avg_confidence = sum(all_confidences) / len(all_confidences)
-        outcome_prices = market.get("outcome_prices", [])
+    if s["decision"] == _VOTE_CODES["NO_TRADE"]:
         consensus_row = {
             "market_id": market_id,
             "final_decision": "NO_TRADE",
-            "avg_confidence": round(avg_confidence, 4),
-            "agreement_ratio": round(no_trade_count / total_valid, 4),
+            "avg_confidence": round(float(s["avg_confidence"]), 4),
+            "agreement_ratio": round(float(s["agreement_ratio"]), 4),
             "bet_amount": 0,
             "bet_odds": 0,
-            "current_odds": float(outcome_prices[0]) if outcome_prices else 0,
+            "current_odds": yes_price if yes_price is not None else 0,
+            "prediction_odds": yes_price,
+            "ai_probability": None,
+            "ev": None,
+            "edge": None,
+            "predicted_at": predicted_at,
         }
         log.info(
             "ev_calculation",
             market_id=market_id,
             majority="NO_TRADE",
-            no_trade_votes=no_trade_count,
-            total_votes=total_valid,
+            no_trade_votes=int(u["no_trade_count"]),
+            total_votes=int(u["total"]),
             decision="NO_TRADE",
         )
         return _upsert_consensus(consensus_row)
 
-    # YES vs NO majority
-    if yes_count > no_count:
-        majority = "YES"
-        majority_count = yes_count
-        majority_preds = yes_votes
-    elif no_count > yes_count:
-        majority = "NO"
-        majority_count = no_count
-        majority_preds = no_votes
-    else:
-        # Tie: break by sum of confidence
-        yes_conf = sum(p.get("confidence", 0) for p in yes_votes)
-        no_conf = sum(p.get("confidence", 0) for p in no_votes)
-        if yes_conf >= no_conf:
-            majority = "YES"
-            majority_count = yes_count
-            majority_preds = yes_votes
-        else:
-            majority = "NO"
-            majority_count = no_count
-            majority_preds = no_votes
-
-    # Calculate metrics
-    all_confidences = [p.get("confidence", 0) for p in valid if p["prediction"] != "NO_TRADE"]
-    avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0
-    agreement_ratio = majority_count / total_valid if total_valid > 0 else 0
-
-    # AI estimated probability for the majority direction
-    majority_confidences = [p.get("confidence", 0) for p in majority_preds]
-    ai_probability = sum(majority_confidences) / len(majority_confidences) if majority_confidences else 0
-
-    # Market prices
-    outcome_prices = market.get("outcome_prices", [])
-    yes_price = float(outcome_prices[0]) if len(outcome_prices) > 0 else 0.5
-    no_price = float(outcome_prices[1]) if len(outcome_prices) > 1 else 0.5
-
-    # Expected Value calculation
-    # EV = (prob_AI × profit) - ((1 - prob_AI) × cost)
-    # For YES bet: profit = 1 - yes_price, cost = yes_price
-    # For NO bet:  profit = 1 - no_price,  cost = no_price
-    if majority == "YES":
-        market_price = yes_price
-    else:
-        market_price = no_price
-
-    ev = (ai_probability * (1 - market_price)) - ((1 - ai_probability) * market_price)
-    edge = ai_probability - market_price
-
     # Decision follows majority vote; EV is informational only
-    final_decision = majority
-
-    # Bet odds
-    if final_decision == "YES":
-        bet_odds = yes_price
-    elif final_decision == "NO":
-        bet_odds = no_price
-    else:
-        bet_odds = 0
-
-    current_odds = yes_price
-
-    # Bet amount scaled by edge magnitude (higher edge = bigger bet)
-    bet_amount = round(max(edge, 0) * 200, 2) if final_decision != "NO_TRADE" else 0
+    final_decision = "YES" if s["decision"] == _VOTE_CODES["YES"] else "NO"
+    current_odds = yes_price if yes_price is not None else 0.5
 
     log.info(
         "ev_calculation",
         market_id=market_id,
-        majority=majority,
-        ai_probability=round(ai_probability, 4),
-        market_price=round(market_price, 4),
-        ev=round(ev, 4),
-        edge=round(edge, 4),
+        majority=final_decision,
+        ai_probability=round(float(s["ai_majority"]), 4),
+        market_price=round(float(s["market_price"]), 4),
+        ev=round(float(s["ev"]), 4),
+        edge=round(float(s["edge"]), 4),
         decision=final_decision,
     )
 
     consensus_row = {
         "market_id": market_id,
         "final_decision": final_decision,
-        "avg_confidence": round(avg_confidence, 4),
-        "agreement_ratio": round(agreement_ratio, 4),
-        "bet_amount": bet_amount,
-        "bet_odds": round(bet_odds, 4),
+        "avg_confidence": round(float(s["avg_confidence"]), 4),
+        "agreement_ratio": round(float(s["agreement_ratio"]), 4),
+        "bet_amount": float(s["bet_amount"]),
+        "bet_odds": round(float(s["bet_odds"]), 4),
         "current_odds": round(current_odds, 4),
+        "prediction_odds": round(current_odds, 4),
+        "ai_probability": _opt(s["ai_probability"]),
+        "ev": _opt(s["ev"]),
+        "edge": _opt(s["edge"]),
+        "predicted_at": predicted_at,
     }
 
     return _upsert_consensus(consensus_row)
@@ -162,3 +253,118 @@ def _upsert_consensus(row: dict) -> dict | None:
     except Exception as e:
         log.error("consensus_store_error", error=str(e), market_id=row["market_id"])
     return None
+
+
+def _load_open_book() -> tuple[list[dict], dict[str, list[dict]]]:
+    """Unresolved consensus rows on active markets plus their predictions."""
+    consensus = (
+        supabase.table("consensus")
+        .select(
+            "market_id, " + ", ".join(_BULK_FIELDS) + ", bet_amount, bet_odds, markets!inner(status, outcome_prices)"
+        )
+        .is_("resolved_at", "null")
+        .eq("markets.status", "active")
+        .execute()
+    )
+    rows = consensus.data or []
+
+    predictions: dict[str, list[dict]] = {}
+    market_ids = [row["market_id"] for row in rows]
+    for start in range(0, len(market_ids), _IN_CHUNK):
+        result = (
+            supabase.table("predictions")
+            .select("market_id, model_name, prediction, confidence, error")
+            .in_("market_id", market_ids[start:start + _IN_CHUNK])
+            .execute()
+        )
+        for p in result.data or []:
+            predictions.setdefault(p["market_id"], []).append(p)
+    return rows, predictions
+
+
+def _changed(old: dict, new: dict) -> bool:
+    for field in _BULK_FIELDS:
+        a, b = old.get(field), new.get(field)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            if abs(a - b) > 1e-4:
+                return True
+        elif a != b:
+            return True
+    return False
+
+
+async def recompute_all_consensus(prices: dict[str, list[float]] | None = None) -> int:
+    """Re-score every open market in one vectorised pass and write back what moved.
+
+    prices maps market_id to fresh [yes, no] outcome prices; markets without
+    an entry are scored at their stored outcome_prices. Returns the number
+    of consensus rows updated.
+    """
+    started = datetime.now(timezone.utc)
+    prices = prices or {}
+    try:
+        rows, predictions = _load_open_book()
+    except Exception as e:
+        log.error("consensus_recompute_load_error", error=str(e))
+        return 0
+    if not rows:
+        return 0
+
+    yes_prices = np.full(len(rows), np.nan)
+    no_prices = np.full(len(rows), np.nan)
+    for i, row in enumerate(rows):
+        # Fall back to the last stored odds, then the market's polled prices
+        stored = [row["current_odds"], 1 - row["current_odds"]] if row.get("current_odds") else None
+        fallback = stored or (row.get("markets") or {}).get("outcome_prices")
+        yes_price, no_price = _prices(prices.get(row["market_id"]) or fallback)
+        if yes_price is not None:
+            yes_prices[i] = yes_price
+            no_prices[i] = no_price if no_price is not None else 1 - yes_price
+
+    unweighted, weighted = _score(
+        [predictions.get(row["market_id"], []) for row in rows],
+        np.nan_to_num(yes_prices, nan=0.5),
+        np.nan_to_num(no_prices, nan=0.5),
+    )
+    scores = weighted if weighted is not None and settings.calibration_weighting_enabled else unweighted
+    decisions = np.array(_DECISIONS)[scores["decision"]]
+    has_price = ~np.isnan(yes_prices)
+
+    changed = []
+    for i, row in enumerate(rows):
+        # Markets whose predictions are all errors keep their stored row
+        if not unweighted["total"][i]:
+            continue
+        new = {
+            "market_id": row["market_id"],
+            "final_decision": str(decisions[i]),
+            "avg_confidence": round(float(scores["avg_confidence"][i]), 4),
+            "agreement_ratio": round(float(scores["agreement_ratio"][i]), 4),
+            "ai_probability": _opt(scores["ai_probability"][i]),
+            "current_odds": round(float(yes_prices[i]), 4) if has_price[i] else row.get("current_odds"),
+            "ev": _opt(scores["ev"][i]) if has_price[i] else None,
+            "edge": _opt(scores["edge"][i]) if has_price[i] else None,
+        }
+        if new["final_decision"] != row.get("final_decision"):
+            if has_price[i]:
+                new["bet_amount"] = float(scores["bet_amount"][i])
+                new["bet_odds"] = round(float(scores["bet_odds"][i]), 4)
+            else:
+                # No price to re-enter at: keep the existing position
+                new["final_decision"] = row.get("final_decision")
+        if _changed(row, new):
+            changed.append(new)
+
+    updated = len(changed) - len(bulk_update("consensus", changed, key="market_id"))
+
+    log.info(
+        "consensus_recomputed",
+        markets=len(rows),
+        updated=updated,
+        weighting_applied=weighted is not None and settings.calibration_weighting_enabled,
+        weighted_disagreements=(
+            int((weighted["decision"] != unweighted["decision"]).sum()) if weighted is not None else None
+        ),
+        elapsed_ms=int((datetime.now(timezone.utc) - started).total_seconds() * 1000),
+    )
+    return updated
@@ -2,17 +2,35 @@ import asyncio
 import json
 import re
 import time
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from openai import AsyncOpenAI
 
 from app.config import settings
 from app.database import supabase
-from app.services.prompt_builder import build_prediction_prompt, SYSTEM_PROMPT
+from app.services import budget_governor
+from app.services.model_registry import get_enabled_model_rows, get_enabled_models
+from app.services.prompt_builder import (
+    BATCH_SYSTEM_PROMPT,
+    EVENT_SYSTEM_PROMPT,
+    PREDICTION_RESPONSE_FORMAT,
+    SYSTEM_PROMPT,
+    build_batch_market_block,
+    build_batch_prediction_prompt,
+    build_event_prediction_prompt,
+    build_budgeted_prompt,
+    compress_text,
+    build_prediction_prompt,
+    estimate_tokens,
+)
+from app.services.question_index import find_similar
+from app.services.telemetry import record_llm_call
 from app.services.web_researcher import research_market
 from app.utils.logger import log
 from app.utils.retry import llm_retry
+from app.utils.usage import USAGE_EXTRA_BODY, extract_usage
 
 # Single OpenRouter client for all models
 _client = AsyncOpenAI(
@@ -20,48 +38,156 @@ _client = AsyncOpenAI(
     api_key=settings.openrouter_api_key,
 )
 
+# Per-model response-format counters, keyed by OpenRouter model id.
+# calls: logical predictions, requests: HTTP attempts (retries included),
+# recovered: needed the tolerant extractor, parse_failures: unrecoverable.
+_format_stats: dict[str, dict[str, int]] = defaultdict(
+    lambda: {"calls": 0, "requests": 0, "recovered": 0, "parse_failures": 0}
+)
 
-def _get_enabled_models() -> dict[str, str]:
-    """Fetch enabled models from the llm_models table."""
-    result = supabase.table("llm_models").select("name, openrouter_id").eq("enabled", True).execute()
-    return {row["name"]: row["openrouter_id"] for row in (result.data or [])}
+_FIELD_RES = {
+    "prediction": re.compile(r'"prediction"\s*:\s*"(YES|NO|NO_TRADE)"', re.IGNORECASE),
+    "confidence": re.compile(r'"confidence"\s*:\s*"?(-?\d+(?:\.\d+)?)'),
+    "reasoning": re.compile(r'"reasoning"\s*:\s*"((?:[^"\\]|\\.)*)', re.DOTALL),
+}
 
 
-def _parse_llm_response(raw_text: str) -> dict:
-    """Parse LLM response text into structured prediction."""
+def _strip_code_fences(raw_text: str) -> str:
     text = raw_text.strip()
-    # Strip markdown code fences if present
     if text.startswith("```"):
         lines = text.split("\n")
         lines = [l for l in lines if not l.strip().startswith("```")]
         text = "\n".join(lines)
+    return text
 
+
+def _loads_lenient(text: str) -> Any:
     try:
-        parsed = json.loads(text)
+        return json.loads(text)
     except json.JSONDecodeError:
         # Fix newlines inside JSON string values (common with Gemini)
         text = re.sub(r'(?<=": ")(.*?)(?="[,\s}])', lambda m: m.group(0).replace("\n", " "), text, flags=re.DOTALL)
-        parsed = json.loads(text)
+        return json.loads(text)
+
 
-    prediction = parsed.get("prediction", "NO_TRADE").upper()
+def _extract_json_object(text: str) -> dict:
+    """Recover the first JSON object from sloppy model output without re-requesting.
+
+    Walks the text once from the first '{', escaping raw newlines inside
+    strings and closing any string/brace left open by a truncated reply.
+    Falls back to pulling the individual fields out with regexes.
+    """
+    start = text.find("{")
+    if start != -1:
+        out: list[str] = []
+        stack: list[str] = []
+        in_string = False
+        escaped = False
+        for ch in text[start:]:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+                elif ch in "\n\r":
+                    ch = " "
+                out.append(ch)
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+            elif ch in "}]" and stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break
+        candidate = "".join(out)
+        if in_string:
+            candidate += '"'
+        candidate = re.sub(r"[,:]\s*$", "", candidate.rstrip())
+        candidate += "".join(reversed(stack))
+        try:
+            parsed = json.loads(candidate)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+
+    fields = {name: rx.search(text) for name, rx in _FIELD_RES.items()}
+    if not fields["prediction"]:
+        raise ValueError("no prediction found in model output")
+    return {
+        "prediction": fields["prediction"].group(1),
+        "confidence": float(fields["confidence"].group(1)) if fields["confidence"] else 0.5,
+        "reasoning": fields["reasoning"].group(1) if fields["reasoning"] else "",
+    }
+
+
+def _parse_llm_response(raw_text: str) -> tuple[dict, bool]:
+    """Parse LLM response text into structured prediction.
+
+    Returns (prediction, recovered) where recovered means the strict parse
+    failed and the tolerant extractor was needed. Raises ValueError only when
+    nothing usable could be extracted.
+    """
+    text = _strip_code_fences(raw_text)
+    try:
+        return _normalize_prediction(_loads_lenient(text)), False
+    except (ValueError, TypeError, AttributeError):
+        return _normalize_prediction(_extract_json_object(text)), True
+
+
+def _normalize_prediction(parsed: dict) -> dict:
+    # Models sometimes send null or numbers for these fields
+    prediction = str(parsed.get("prediction") or "NO_TRADE").upper()
     if prediction not in ("YES", "NO", "NO_TRADE"):
         prediction = "NO_TRADE"
 
-    confidence = float(parsed.get("confidence", 0.5))
+    confidence = parsed.get("confidence")
+    confidence = float(0.5 if confidence is None else confidence)
     confidence = max(0.0, min(1.0, confidence))
 
     return {
         "prediction": prediction,
         "confidence": confidence,
-        "reasoning": parsed.get("reasoning", ""),
+        "reasoning": str(parsed.get("reasoning") or ""),
     }
 
 
+def get_format_stats() -> dict[str, dict]:
+    """Per-model parse-failure and re-request rates since process start."""
+    stats = {}
+    for model_id, s in _format_stats.items():
+        calls = s["calls"] or 1
+        stats[model_id] = {
+            **s,
+            "parse_failure_rate": round(s["parse_failures"] / calls, 4),
+            "recovered_rate": round(s["recovered"] / calls, 4),
+            "re_request_rate": round(max(s["requests"] - s["calls"], 0) / calls, 4),
+        }
+    return stats
+
+
 @llm_retry
-async def _call_model(model_id: str, prompt: str) -> dict[str, Any]:
-    """Call a model via OpenRouter."""
+async def _call_model(
+    model_id: str, prompt: str, structured: bool = False, tracker: dict | None = None
+) -> dict[str, Any]:
+    """Call a model via OpenRouter.
+
+    Only transport/API errors raise (and get retried). Formatting problems are
+    handled locally, so a sloppy reply never re-issues the paid request.
+    tracker, when given, counts attempts across retries for telemetry.
+    """
     start = time.monotonic()
+    _format_stats[model_id]["requests"] += 1
+    if tracker is not None:
+        tracker["attempts"] += 1
+        tracker.setdefault("started_at", start)
 
+    extra = {"response_format": PREDICTION_RESPONSE_FORMAT} if structured else {}
     resp = await _client.chat.completions.create(
         model=model_id,
         messages=[
@@ -70,31 +196,86 @@ async def _call_model(model_id: str, prompt: str) -> dict[str, Any]:
         ],
         temperature=0.3,
         max_tokens=1000,
+        extra_body=USAGE_EXTRA_BODY,
+        **extra,
     )
 
     elapsed_ms = int((time.monotonic() - start) * 1000)
     raw_text = resp.choices[0].message.content or "{}"
-    parsed = _parse_llm_response(raw_text)
+    try:
+        parsed, recovered = _parse_llm_response(raw_text)
+        parse_error = None
+    except Exception as e:
+        # Any parse/normalize failure is local: never re-send the paid request
+        parsed = {"prediction": "NO_TRADE", "confidence": 0.0, "reasoning": ""}
+        recovered, parse_error = False, str(e)
+    usage = extract_usage(resp)
+    if usage["cached_tokens"] is not None:
+        log.debug("prompt_cache", model=model_id, prompt_tokens=usage["prompt_tokens"], cached_tokens=usage["cached_tokens"])
 
     return {
         **parsed,
-        "raw_response": {"text": raw_text, "model": model_id},
+        "raw_response": {"text": raw_text, "model": model_id, "usage": usage, "structured": structured},
         "response_time_ms": elapsed_ms,
+        "recovered": recovered,
+        "parse_error": parse_error,
     }
 
 
-async def _safe_call(name: str, model_id: str, prompt: str, market_id: str) -> dict:
-    """Wrap an LLM call with error handling."""
+async def _safe_call(
+    name: str, model_id: str, prompt: str, market_id: str, kind: str = "prediction"
+) -> dict:
+    """Wrap an LLM call with error handling and telemetry."""
+    structured = bool(get_enabled_model_rows().get(name, {}).get("supports_structured_output"))
+    _format_stats[model_id]["calls"] += 1
+    enqueued_at = time.monotonic()
+    tracker = {"attempts": 0}
+    est_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt) + budget_governor.EST_COMPLETION_TOKENS
     try:
-        result = await _call_model(model_id, prompt)
+        await budget_governor.acquire_tokens(model_id, est_tokens)
+        result = await _call_model(model_id, prompt, structured=structured, tracker=tracker)
+        recovered = result.pop("recovered")
+        parse_error = result.pop("parse_error")
+        usage = result["raw_response"]["usage"]
+        if usage["prompt_tokens"] is not None:
+            budget_governor.reconcile_tokens(
+                model_id, est_tokens, usage["prompt_tokens"] + (usage["completion_tokens"] or 0)
+            )
+        if usage["cost"] is None:
+            # Provider did not report cost: derive it from tokens and llm_models pricing
+            usage["cost"] = budget_governor.actual_cost(name, usage)
+        if recovered:
+            _format_stats[model_id]["recovered"] += 1
+        if parse_error:
+            _format_stats[model_id]["parse_failures"] += 1
+            log.warning("llm_parse_failed", model=name, market_id=market_id, error=parse_error)
+        record_llm_call(
+            name,
+            kind,
+            usage,
+            latency_ms=result["response_time_ms"],
+            attempts=tracker["attempts"],
+            queue_ms=(tracker["started_at"] - enqueued_at) * 1000,
+            ok=not parse_error,
+        )
         return {
             "market_id": market_id,
             "model_name": name,
             **result,
-            "error": None,
+            "error": f"parse_error: {parse_error}" if parse_error else None,
         }
     except Exception as e:
         log.error("llm_call_failed", model=name, market_id=market_id, error=str(e))
+        started_at = tracker.get("started_at", enqueued_at)
+        record_llm_call(
+            name,
+            kind,
+            None,
+            latency_ms=(time.monotonic() - started_at) * 1000,
+            attempts=tracker["attempts"],
+            queue_ms=(started_at - enqueued_at) * 1000,
+            ok=False,
+        )
         return {
             "market_id": market_id,
             "model_name": name,
@@ -107,36 +288,413 @@ async def _safe_call(name: str, model_id: str, prompt: str, market_id: str) -> d
         }
 
 
-async def get_all_predictions(market: dict) -> list[dict]:
-    """Run all enabled LLMs in parallel via OpenRouter and return predictions."""
-    models = _get_enabled_models()
+def _call_cost(result: dict) -> float:
+    return (result.get("raw_response", {}).get("usage") or {}).get("cost") or 0.0
+
+
+def _iter_json_objects(text: str):
+    """Yield every top-level-in-array {...} substring, tracking strings and escapes."""
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
+
+def _parse_batch_response(raw_text: str, market_ids: set[str]) -> dict[str, dict]:
+    """Parse a batched JSON array into {market_id: prediction}.
+
+    Items are parsed one by one so a single malformed object only loses that
+    market; unknown or duplicate market_ids are ignored.
+    """
+    text = _strip_code_fences(raw_text)
+    try:
+        items = _loads_lenient(text)
+        if isinstance(items, dict):
+            items = items.get("predictions") or [items]
+        if not isinstance(items, list):
+            # Valid JSON but not a batch (e.g. a bare number): every market falls back
+            log.warning("batch_parse_failed", reply_type=type(items).__name__)
+            items = []
+    except (json.JSONDecodeError, ValueError):
+        items = []
+        for chunk in _iter_json_objects(text):
+            try:
+                items.append(_loads_lenient(chunk))
+            except (json.JSONDecodeError, ValueError):
+                continue
+
+    results: dict[str, dict] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        market_id = str(item.get("market_id", ""))
+        if market_id not in market_ids or market_id in results:
+            continue
+        try:
+            results[market_id] = _normalize_prediction(item)
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return results
+
+
+def _pack_batches(markets: list[dict]) -> list[list[tuple[dict, str]]]:
+    """Group markets into batches bounded by batch size and prompt token budget."""
+    batches: list[list[tuple[dict, str]]] = []
+    current: list[tuple[dict, str]] = []
+    current_tokens = estimate_tokens(BATCH_SYSTEM_PROMPT)
+    for market in markets:
+        block = build_batch_market_block(market)
+        block_tokens = estimate_tokens(block)
+        if current and (
+            len(current) >= settings.batch_screen_size
+            or current_tokens + block_tokens > settings.batch_screen_max_prompt_tokens
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = estimate_tokens(BATCH_SYSTEM_PROMPT)
+        current.append((market, block))
+        current_tokens += block_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+@llm_retry
+async def _call_model_batch(
+    model_id: str,
+    prompt: str,
+    market_ids: set[str],
+    system_prompt: str = BATCH_SYSTEM_PROMPT,
+    tokens_per_market: int | None = None,
+) -> tuple[dict[str, dict], dict, int]:
+    """Call a model once for a whole batch of markets."""
+    start = time.monotonic()
+
+    resp = await _client.chat.completions.create(
+        model=model_id,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        max_tokens=(tokens_per_market or settings.batch_screen_tokens_per_market) * len(market_ids),
+        extra_body=USAGE_EXTRA_BODY,
+    )
+
+    elapsed_ms = int((time.monotonic() - start) * 1000)
+    raw_text = resp.choices[0].message.content or "[]"
+    try:
+        parsed = _parse_batch_response(raw_text, market_ids)
+    except Exception as e:
+        # A garbled reply is a parse failure, not a reason to re-send the paid batch
+        log.warning("batch_parse_failed", model=model_id, error=str(e))
+        parsed = {}
+    return parsed, extract_usage(resp), elapsed_ms
+
+
+async def screen_markets(markets: list[dict], lane: str = "backlog") -> dict[str, dict]:
+    """Run the cascade screening model over many markets with batched prompts.
+
+    Returns {market_id: prediction} in the same shape as _safe_call. Markets the
+    batch response leaves out or garbles fall back to a single-market call.
+    Markets rejected by the price/time heuristics are not screened.
+    """
+    models = get_enabled_models()
+    screen_name = settings.cascade_screen_model
+    if screen_name not in models:
+        return {}
+    model_id = models[screen_name]
+
+    candidates = [m for m in markets if not _triage(m)]
+    if not candidates:
+        return {}
+    if budget_governor.remaining(lane) <= 0:
+        log.info("batch_screen_deferred", lane=lane, markets=len(candidates))
+        return {}
+
+    start = time.monotonic()
+    results: dict[str, dict] = {}
+    fallbacks: list[dict] = []
+    batches = _pack_batches(candidates)
+
+    async def run_batch(batch: list[tuple[dict, str]]):
+        ids = {m["id"] for m, _ in batch}
+        prompt = build_batch_prediction_prompt([block for _, block in batch])
+        est_tokens = (
+            estimate_tokens(BATCH_SYSTEM_PROMPT)
+            + estimate_tokens(prompt)
+            + settings.batch_screen_tokens_per_market * len(ids)
+        )
+        batch_start = time.monotonic()
+        try:
+            await budget_governor.acquire_tokens(model_id, est_tokens)
+            parsed, usage, elapsed_ms = await _call_model_batch(model_id, prompt, ids)
+            if usage["prompt_tokens"] is not None:
+                budget_governor.reconcile_tokens(
+                    model_id, est_tokens, usage["prompt_tokens"] + (usage["completion_tokens"] or 0)
+                )
+            if usage["cost"] is None:
+                usage["cost"] = budget_governor.actual_cost(screen_name, usage)
+            budget_governor.reserve(lane, usage["cost"] or 0.0)
+            record_llm_call(screen_name, "batch_screen", usage, latency_ms=elapsed_ms)
+        except Exception as e:
+            log.error("batch_screen_failed", model=screen_name, markets=len(batch), error=str(e))
+            parsed, usage, elapsed_ms = {}, {}, 0
+            record_llm_call(
+                screen_name, "batch_screen", None, latency_ms=(time.monotonic() - batch_start) * 1000, ok=False
+            )
+        for market, _ in batch:
+            if market["id"] in parsed:
+                results[market["id"]] = {
+                    "market_id": market["id"],
+                    "model_name": screen_name,
+                    **parsed[market["id"]],
+                    "raw_response": {"model": model_id, "batch_size": len(batch), "batch_usage": usage},
+                    "response_time_ms": elapsed_ms,
+                    "error": None,
+                }
+            else:
+                fallbacks.append(market)
+
+    await asyncio.gather(*(run_batch(b) for b in batches))
+
+    fallback_results = await asyncio.gather(*(
+        _safe_call(screen_name, model_id, build_prediction_prompt(m), m["id"], kind="screen") for m in fallbacks
+    ))
+    for r in fallback_results:
+        budget_governor.reserve(lane, _call_cost(r))
+        results[r["market_id"]] = r
+
+    elapsed = time.monotonic() - start
+    requests = len(batches) + len(fallbacks)
+    log.info(
+        "batch_screen_complete",
+        model=screen_name,
+        markets=len(candidates),
+        batches=len(batches),
+        fallbacks=len(fallbacks),
+        requests=requests,
+        single_path_requests=len(candidates),
+        elapsed_ms=int(elapsed * 1000),
+        markets_per_sec=round(len(candidates) / elapsed, 2) if elapsed > 0 else None,
+    )
+    return results
+
+
+def _yes_price(market: dict) -> float | None:
+    prices = market.get("outcome_prices") or []
+    return float(prices[0]) if prices else None
+
+
+def _hours_to_end(market: dict) -> float | None:
+    end_date = market.get("end_date")
+    if not end_date:
+        return None
+    try:
+        if isinstance(end_date, str):
+            end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+        else:
+            end_dt = end_date
+        return (end_dt - datetime.now(timezone.utc)).total_seconds() / 3600
+    except Exception:
+        return None
+
+
+def _triage(market: dict) -> str | None:
+    """Cheap price/time heuristics. Returns a skip reason, or None to continue."""
+    yes_price = _yes_price(market)
+    if yes_price is not None:
+        if min(yes_price, 1 - yes_price) < settings.cascade_extreme_price:
+            return "near_certain_price"
+
+    hours = _hours_to_end(market)
+    if hours is not None and hours < settings.cascade_min_hours_to_end:
+        return "ending_soon" if hours > 0 else "expired"
+
+    return None
+
+
+def _screen_edge(market: dict, screen: dict) -> float:
+    """Possible edge left by the screening model's YES probability vs the market price."""
+    yes_price = _yes_price(market)
+    if yes_price is None or screen["prediction"] == "NO_TRADE":
+        return 0.0
+    p_yes = screen["confidence"] if screen["prediction"] == "YES" else 1 - screen["confidence"]
+    return abs(p_yes - yes_price)
+
+
+# Lanes that go through the cascade; manual and explore runs always get the full panel
+_CASCADE_LANES = ("backlog", "reprediction")
+
+
+def _record_cascade_decision(
+    market_id: str, stage: str, reason: str, est_cost_saved: float, screen_edge: float | None = None
+):
+    log.info(
+        "cascade_skip",
+        market_id=market_id,
+        stage=stage,
+        reason=reason,
+        est_cost_saved=round(est_cost_saved, 4),
+        screen_edge=round(screen_edge, 4) if screen_edge is not None else None,
+    )
+    try:
+        supabase.table("cascade_decisions").insert({
+            "market_id": market_id,
+            "stage": stage,
+            "reason": reason,
+            "screen_edge": screen_edge,
+            "est_cost_saved": round(est_cost_saved, 6),
+        }).execute()
+        # Marks the market so the backlog doesn't re-triage it every cycle
+        supabase.table("markets").update({
+            "cascade_skipped_at": datetime.now(timezone.utc).isoformat(),
+            "cascade_skip_reason": f"{stage}:{reason}",
+        }).eq("id", market_id).execute()
+    except Exception as e:
+        log.warning("cascade_record_error", market_id=market_id, error=str(e))
+
+
+def _reusable_research(market: dict) -> str:
+    """Fresh web research from a near-duplicate market (e.g. the same recurring question)."""
+    if not settings.similar_research_reuse_enabled or not market.get("question"):
+        return ""
+    try:
+        similar = find_similar(
+            market["question"],
+            threshold=settings.similar_research_threshold,
+            limit=20,
+            exclude_id=market["id"],
+            same_terms=True,
+        )
+        if not similar:
+            return ""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.similar_research_max_age_hours)
+        result = (
+            supabase.table("markets")
+            .select("id, web_research, web_research_at")
+            .in_("id", [market_id for market_id, _ in similar])
+            .gte("web_research_at", cutoff.isoformat())
+            .order("web_research_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if result.data and result.data[0].get("web_research"):
+            log.info("research_reused", market_id=market["id"], source_market_id=result.data[0]["id"])
+            return result.data[0]["web_research"]
+    except Exception as e:
+        log.warning("research_reuse_error", market_id=market["id"], error=str(e))
+    return ""
+
+
+async def get_all_predictions(market: dict, screen: dict | None = None, lane: str = "manual") -> list[dict]:
+    """Run all enabled LLMs in parallel via OpenRouter and return predictions.
+
+    With the cascade enabled, backlog and reprediction markets are triaged
+    first: price/time heuristics, then a single screening model without
+    research. Research and the full model panel only run when the earlier
+    stage leaves enough possible edge; a skipped market gets no predictions.
+    A screening result already computed by screen_markets can be passed in;
+    it only gates the market and never counts as a panel vote.
+
+    Spend is charged to lane. When the lane's budget is short, the governor
+    drops research and expensive models, or defers the market (returns []).
+    """
+    models = get_enabled_models()
     if not models:
         log.warning("no_enabled_models", market_id=market["id"])
         return []
 
     market_id = market["id"]
 
-    # Web research step
-    research_context = await research_market(
-        question=market.get("question", ""),
-        description=market.get("description", ""),
+    if settings.cascade_enabled and lane in _CASCADE_LANES:
+        full_cost = settings.cascade_research_cost_usd + len(models) * settings.cascade_model_call_cost_usd
+
+        reason = _triage(market)
+        if reason:
+            _record_cascade_decision(market_id, "heuristic", reason, full_cost)
+            return []
+
+        screen_name = settings.cascade_screen_model
+        if screen is None and screen_name in models:
+            screen = await _safe_call(
+                screen_name, models[screen_name], build_prediction_prompt(market), market_id, kind="screen"
+            )
+            budget_governor.reserve(lane, _call_cost(screen))
+        if screen is not None and not screen["error"]:
+            edge = _screen_edge(market, screen)
+            if edge < settings.cascade_min_edge:
+                saved = full_cost - settings.cascade_model_call_cost_usd
+                _record_cascade_decision(market_id, "screen", "low_edge", saved, screen_edge=edge)
+                return []
+
+    est_prompt_tokens = (
+        estimate_tokens(SYSTEM_PROMPT)
+        + estimate_tokens(build_prediction_prompt(market))
+        + settings.prompt_research_token_budget
     )
+    budget = budget_governor.plan(lane, list(models), est_prompt_tokens, research=settings.web_research_enabled)
+    if budget.defer:
+        return []
+    models = {name: models[name] for name in budget.models}
+
+    # Web research step, reusing a near-duplicate market's fresh research when possible
+    research_context, research_cost = "", 0.0
+    if budget.research:
+        research_context = _reusable_research(market)
+        if not research_context:
+            research_context, research_cost = await research_market(
+                question=market.get("question", ""),
+                description=market.get("description", ""),
+            )
 
     # Save web research to the market record
     if research_context:
-        supabase.table("markets").update({
+        research_row = {
             "web_research": research_context,
             "web_research_at": datetime.now(timezone.utc).isoformat(),
-        }).eq("id", market_id).execute()
+        }
+        supabase.table("markets").update(research_row).eq("id", market_id).execute()
+        market.update(research_row)
 
-    prompt = build_prediction_prompt(market, research_context=research_context)
+    prompt, token_report = build_budgeted_prompt(
+        market,
+        research_context=research_context,
+        research_budget=settings.prompt_research_token_budget,
+        description_budget=settings.prompt_description_token_budget,
+    )
+    log.info("prompt_budget", market_id=market_id, models=len(models), **token_report)
 
+    # The screening model answers again here: its screen had no research and
+    # may have come from the one-line batch prompt, so it isn't a panel vote
     tasks = [
         _safe_call(name, model_id, prompt, market_id)
         for name, model_id in models.items()
     ]
     results = await asyncio.gather(*tasks)
 
+    spent = research_cost + sum(_call_cost(r) for r in results)
+    budget_governor.reconcile(lane, budget.reserved, spent)
+
     log.info(
         "predictions_complete",
         market_id=market_id,
@@ -145,3 +703,134 @@ async def get_all_predictions(market: dict) -> list[dict]:
     )
 
     return list(results)
+
+
+async def get_event_predictions(
+    event_slug: str, markets: list[dict], lane: str = "backlog"
+) -> dict[str, list[dict]]:
+    """Predict all sibling markets of one event with one research call and one call per model.
+
+    Returns {market_id: [prediction per model]}. Siblings a model's reply
+    leaves out or garbles fall back to a single-market call for that model.
+    Markets rejected by the cascade heuristics get no predictions.
+    """
+    models = get_enabled_models()
+    if not models:
+        log.warning("no_enabled_models", event_slug=event_slug)
+        return {}
+
+    candidates = []
+    for market in markets:
+        reason = _triage(market) if settings.cascade_enabled and lane in _CASCADE_LANES else None
+        if reason:
+            _record_cascade_decision(
+                market["id"],
+                "heuristic",
+                reason,
+                settings.cascade_research_cost_usd + len(models) * settings.cascade_model_call_cost_usd,
+            )
+        else:
+            candidates.append(market)
+    if not candidates:
+        return {}
+
+    blocks = [build_batch_market_block(m) for m in candidates]
+    est_prompt_tokens = (
+        estimate_tokens(EVENT_SYSTEM_PROMPT)
+        + sum(estimate_tokens(b) for b in blocks)
+        + settings.prompt_research_token_budget
+    )
+    budget = budget_governor.plan(lane, list(models), est_prompt_tokens, research=settings.web_research_enabled)
+    if budget.defer:
+        return {}
+    models = {name: models[name] for name in budget.models}
+
+    # One research call for the whole event
+    research_context, research_cost = "", 0.0
+    if budget.research:
+        research_context, research_cost = await research_market(
+            question=f"Polymarket event '{event_slug}' and its outcomes",
+            description="\n".join(m.get("question", "") for m in candidates),
+        )
+    if research_context:
+        research_row = {
+            "web_research": research_context,
+            "web_research_at": datetime.now(timezone.utc).isoformat(),
+        }
+        supabase.table("markets").update(research_row).in_("id", [m["id"] for m in candidates]).execute()
+        for market in candidates:
+            market.update(research_row)
+
+    compressed = compress_text(research_context, settings.prompt_research_token_budget)
+    prompt = build_event_prediction_prompt(event_slug, blocks, research_context=compressed)
+    ids = {m["id"] for m in candidates}
+
+    async def run_model(name: str, model_id: str) -> list[dict]:
+        start = time.monotonic()
+        try:
+            await budget_governor.acquire_tokens(model_id, est_prompt_tokens)
+            parsed, usage, elapsed_ms = await _call_model_batch(
+                model_id,
+                prompt,
+                ids,
+                system_prompt=EVENT_SYSTEM_PROMPT,
+                tokens_per_market=settings.event_tokens_per_market,
+            )
+            if usage["prompt_tokens"] is not None:
+                budget_governor.reconcile_tokens(
+                    model_id, est_prompt_tokens, usage["prompt_tokens"] + (usage["completion_tokens"] or 0)
+                )
+            if usage["cost"] is None:
+                usage["cost"] = budget_governor.actual_cost(name, usage)
+            record_llm_call(name, "event", usage, latency_ms=elapsed_ms)
+        except Exception as e:
+            log.error("event_call_failed", model=name, event_slug=event_slug, error=str(e))
+            parsed, usage, elapsed_ms = {}, {}, 0
+            record_llm_call(name, "event", None, latency_ms=(time.monotonic() - start) * 1000, ok=False)
+
+        preds = [
+            {
+                "market_id": m["id"],
+                "model_name": name,
+                **parsed[m["id"]],
+                "raw_response": {"model": model_id, "event_slug": event_slug, "event_usage": usage},
+                "response_time_ms": elapsed_ms,
+                "error": None,
+            }
+            for m in candidates
+            if m["id"] in parsed
+        ]
+        missing = [m for m in candidates if m["id"] not in parsed]
+        if missing:
+            log.warning("event_fallback", model=name, event_slug=event_slug, markets=len(missing))
+            preds.extend(await asyncio.gather(*(
+                _safe_call(name, model_id, build_prediction_prompt(m, research_context=compressed), m["id"])
+                for m in missing
+            )))
+        return preds
+
+    per_model = await asyncio.gather(*(run_model(name, model_id) for name, model_id in models.items()))
+
+    results: dict[str, list[dict]] = {m["id"]: [] for m in candidates}
+    spent = research_cost
+    event_costs = {}
+    for preds in per_model:
+        for p in preds:
+            results[p["market_id"]].append(p)
+            if "event_usage" in p["raw_response"]:
+                event_costs[p["model_name"]] = p["raw_response"]["event_usage"].get("cost") or 0.0
+            else:
+                spent += _call_cost(p)
+    spent += sum(event_costs.values())
+    budget_governor.reconcile(lane, budget.reserved, spent)
+
+    log.info(
+        "event_predictions_complete",
+        event_slug=event_slug,
+        markets=len(candidates),
+        models=len(models),
+        model_calls=len(models),
+        single_path_calls=len(candidates) * len(models),
+        has_research=bool(research_context),
+    )
+    return results
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.database import supabase
+from app.utils.logger import log
+
+# In-process cache of enabled llm_models rows, keyed by model name
+_cache: dict[str, dict] = {}
+_loaded_at: float = 0.0
+
+_realtime_client = None
+_realtime_channel = None
+_listen_task = None
+
+
+def _load() -> dict[str, dict]:
+    """Fetch enabled models from the llm_models table."""
+    result = supabase.table("llm_models").select("*").eq("enabled", True).execute()
+    return {row["name"]: row for row in (result.data or [])}
+
+
+def get_enabled_model_rows() -> dict[str, dict]:
+    """Return enabled llm_models rows, refreshing the cache once the TTL expires."""
+    global _cache, _loaded_at
+
+    if not _loaded_at or time.monotonic() - _loaded_at > settings.model_registry_ttl_seconds:
+        _cache = _load()
+        _loaded_at = time.monotonic()
+        log.info("model_registry_loaded", models=sorted(_cache))
+    return _cache
+
+
+def get_enabled_models() -> dict[str, str]:
+    """Return a {name: openrouter_id} map of enabled models."""
+    return {name: row["openrouter_id"] for name, row in get_enabled_model_rows().items()}
+
+
+def invalidate(reason: str = "manual"):
+    """Drop the cached registry so the next lookup re-reads llm_models."""
+    global _loaded_at
+    _loaded_at = 0.0
+    log.info("model_registry_invalidated", reason=reason)
+
+
+def _on_models_change(payload: dict):
+    invalidate(reason="realtime")
+
+
+async def start_registry_listener():
+    """Subscribe to realtime changes on llm_models so other processes' edits invalidate us.
+
+    The table is already part of the supabase_realtime publication. Failure to
+    subscribe is non-fatal: the TTL still bounds how stale the cache can get.
+    """
+    global _realtime_client, _realtime_channel, _listen_task
+
+    if not settings.model_registry_realtime_enabled:
+        return
+
+    try:
+        from supabase import acreate_client
+
+        _realtime_client = await acreate_client(settings.supabase_url, settings.supabase_service_key)
+        realtime = _realtime_client.realtime
+        await realtime.connect()
+        # Older realtime clients only read the socket while listen() runs
+        if getattr(realtime, "_listen_task", None) is None and hasattr(realtime, "listen"):
+            _listen_task = asyncio.create_task(realtime.listen())
+        _realtime_channel = _realtime_client.channel("llm_models_registry")
+        _realtime_channel.on_postgres_changes(
+            "*",
+            schema="public",
+            table="llm_models",
+            callback=_on_models_change,
+        )
+        await _realtime_channel.subscribe()
+        log.info("model_registry_listener_started")
+    except Exception as e:
+        log.warning("model_registry_listener_error", error=str(e))
+        await stop_registry_listener()
+
+
+async def stop_registry_listener():
+    """Unsubscribe and close the realtime socket opened by start_registry_listener."""
+    global _realtime_client, _realtime_channel, _listen_task
+
+    try:
+        if _realtime_channel is not None:
+            await _realtime_channel.unsubscribe()
+        if _realtime_client is not None:
+            await _realtime_client.realtime.close()
+    except Exception as e:
+        log.warning("model_registry_listener_stop_error", error=str(e))
+    if _listen_task is not None:
+        _listen_task.cancel()
+    _realtime_client = None
+    _realtime_channel = None
+    _listen_task = None
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database import supabase
+from app.utils.logger import log
+
+# Bucket width per stored resolution, finest first
+RESOLUTIONS = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+_INSERT_CHUNK = 500
+
+# Last YES price written per market, so unchanged prices are skipped
+_last_written: dict[str, float] = {}
+
+
+def record_prices(prices: dict[str, float], ts: datetime | None = None) -> int:
+    """Append one tick per market whose YES price moved since the last write.
+
+    Bucket rollups happen in the odds_history_rollup trigger.
+    """
+    ts_iso = (ts or datetime.now(timezone.utc)).isoformat()
+    rows = [
+        {"market_id": market_id, "ts": ts_iso, "yes_price": round(price, 4)}
+        for market_id, price in prices.items()
+        if market_id not in _last_written
+        or abs(price - _last_written[market_id]) >= settings.odds_history_min_move
+    ]
+
+    written = 0
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        chunk = rows[start:start + _INSERT_CHUNK]
+        try:
+            supabase.table("odds_history").upsert(chunk, on_conflict="market_id,ts").execute()
+            for row in chunk:
+                _last_written[row["market_id"]] = row["yes_price"]
+            written += len(chunk)
+        except Exception as e:
+            log.error("odds_history_write_error", rows=len(chunk), error=str(e))
+
+    log.info("odds_history_recorded", markets=len(prices), written=written)
+    return written
+
+
+def _retention(resolution: str) -> timedelta | None:
+    days = {
+        "raw": settings.odds_history_raw_retention_days,
+        "1m": settings.odds_history_minute_retention_days,
+        "1h": settings.odds_history_hour_retention_days,
+    }.get(resolution)
+    return timedelta(days=days) if days is not None else None
+
+
+def pick_resolution(start: datetime, end: datetime, max_points: int) -> str:
+    """Finest bucket resolution that covers start..end in at most max_points
+    and is still retained that far back."""
+    now = datetime.now(timezone.utc)
+    for resolution, width in RESOLUTIONS.items():
+        retention = _retention(resolution)
+        if retention is not None and start < now - retention:
+            continue
+        if (end - start) / width <= max_points:
+            return resolution
+    return "1d"
+
+
+def get_odds_history(
+    market_id: str,
+    start: datetime,
+    end: datetime,
+    resolution: str | None = None,
+    max_points: int = 500,
+) -> dict:
+    """Points for start..end, oldest first.
+
+    When the range holds more than max_points, the most recent ones are kept.
+    """
+    resolution = resolution or pick_resolution(start, end, max_points)
+
+    if resolution == "raw":
+        result = (
+            supabase.table("odds_history")
+            .select("ts, yes_price")
+            .eq("market_id", market_id)
+            .gte("ts", start.isoformat())
+            .lte("ts", end.isoformat())
+            .order("ts", desc=True)
+            .limit(max_points)
+            .execute()
+        )
+        points = [
+            {"t": r["ts"], "open": r["yes_price"], "high": r["yes_price"],
+             "low": r["yes_price"], "close": r["yes_price"], "samples": 1}
+            for r in reversed(result.data or [])
+        ]
+    else:
+        result = (
+            supabase.table("odds_history_buckets")
+            .select("bucket_start, open, high, low, close, samples")
+            .eq("market_id", market_id)
+            .eq("resolution", resolution)
+            .gte("bucket_start", (start - RESOLUTIONS[resolution]).isoformat())
+            .lte("bucket_start", end.isoformat())
+            .order("bucket_start", desc=True)
+            .limit(max_points + 1)
+            .execute()
+        )
+        points = [
+            {"t": r["bucket_start"], "open": r["open"], "high": r["high"],
+             "low": r["low"], "close": r["close"], "samples": r.get("samples") or 1}
+            for r in reversed(result.data or [])
+        ]
+
+    return {"market_id": market_id, "resolution": resolution, "points": points}
+
+
+async def prune_odds_history() -> int:
+    """Drop raw ticks and fine buckets past their retention (daily buckets are kept)."""
+    try:
+        result = supabase.rpc(
+            "prune_odds_history",
+            {
+                "raw_days": settings.odds_history_raw_retention_days,
+                "minute_days": settings.odds_history_minute_retention_days,
+                "hour_days": settings.odds_history_hour_retention_days,
+            },
+        ).execute()
+        deleted = result.data or 0
+        log.info("odds_history_pruned", deleted=deleted)
+        return deleted
+    except Exception as e:
+        log.error("odds_history_prune_error", error=str(e))
+        return 0
@@ -2,11 +2,12 @@ from datetime import datetime, timezone
 
 from app.database import supabase
 from app.models.schemas import PerformanceSummary, ModelPerformance, PnlPoint
+from app.utils.bulk import bulk_update
 from app.utils.logger import log
 
 
-async def resolve_market(consensus_entry: dict, outcome: str):
-    """Resolve a market and compute P&L for the consensus entry.
+def _settle(consensus_entry: dict, outcome: str) -> tuple[float, bool | None]:
+    """P&L and correctness of one consensus entry given the market outcome.
 
     P&L logic (hypothetical):
     - If we bet YES at price P, and outcome is YES: profit = bet_amount * (1/P - 1)
@@ -19,33 +20,81 @@ async def resolve_market(consensus_entry: dict, outcome: str):
     bet_odds = consensus_entry.get("bet_odds", 0)
 
     if final_decision == "NO_TRADE" or bet_amount == 0:
-        pnl = 0
-        is_correct = None
-    else:
-        outcome_normalized = outcome.strip().upper()
-        is_correct = final_decision == ("YES" if outcome_normalized in ("YES", "Y") else "NO")
-
-        if is_correct and bet_odds > 0:
-            pnl = round(bet_amount * (1 / bet_odds - 1), 2)
-        else:
-            pnl = -bet_amount
-
-    try:
-        supabase.table("consensus").update({
+        return 0, None
+
+    outcome_normalized = outcome.strip().upper()
+    is_correct = final_decision == ("YES" if outcome_normalized in ("YES", "Y") else "NO")
+
+    if is_correct and bet_odds > 0:
+        return round(bet_amount * (1 / bet_odds - 1), 2), is_correct
+    return -bet_amount, is_correct
+
+
+async def resolve_market(consensus_entry: dict, outcome: str):
+    """Resolve a market and compute P&L for the consensus entry."""
+    await resolve_markets([(consensus_entry, outcome)])
+
+
+async def resolve_markets(resolutions: list[tuple[dict, str]], update_markets: bool = False) -> int:
+    """Resolve many consensus entries with one bulk_update request.
+
+    With update_markets, the markets rows are marked resolved first; a
+    market whose row fails is not resolved in consensus either. Rows that
+    fail are logged and left unresolved for the next cycle. Returns the
+    number of entries resolved.
+    """
+    if not resolutions:
+        return 0
+
+    resolved_at = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for entry, outcome in resolutions:
+        pnl, is_correct = _settle(entry, outcome)
+        rows.append({
+            "market_id": entry["market_id"],
             "pnl": pnl,
             "is_correct": is_correct,
-            "resolved_at": datetime.now(timezone.utc).isoformat(),
-        }).eq("id", consensus_entry["id"]).execute()
-
+            "resolved_at": resolved_at,
+        })
+
+    failed: dict[str, str] = {}
+    if update_markets:
+        failed = bulk_update(
+            "markets",
+            [{"id": entry["market_id"], "status": "resolved", "outcome": outcome} for entry, outcome in resolutions],
+        )
+        if failed:
+            # Leave the consensus row open too, so the whole market is retried next cycle
+            log.error("market_resolve_update_failed", markets=len(failed), market_ids=sorted(failed)[:20])
+    consensus_rows = [row for row in rows if row["market_id"] not in failed]
+    failed.update(bulk_update("consensus", consensus_rows, key="market_id"))
+
+    done = [
+        (entry, outcome, row)
+        for (entry, outcome), row in zip(resolutions, rows)
+        if row["market_id"] not in failed
+    ]
+    if not done:
+        return 0
+
+    from app.workers.reprediction_scheduler import on_resolved
+    for entry, _, _ in done:
+        on_resolved(entry["market_id"])
+
+    from app.services.calibration import on_markets_resolved
+    on_markets_resolved({entry["market_id"]: outcome for entry, outcome, _ in done})
+    invalidate_performance_cache()
+
+    for entry, outcome, row in done:
         log.info(
             "market_resolved",
-            consensus_id=consensus_entry["id"],
+            consensus_id=entry.get("id"),
+            market_id=entry["market_id"],
             outcome=outcome,
-            is_correct=is_correct,
-            pnl=pnl,
+            is_correct=row["is_correct"],
+            pnl=row["pnl"],
         )
-    except Exception as e:
-        log.error("resolve_market_error", error=str(e))
+    return len(done)
 
 
 async def compute_summary() -> PerformanceSummary:
@@ -85,96 +134,147 @@ async def compute_summary() -> PerformanceSummary:
     )
 
 
-async def compute_by_model() -> list[ModelPerformance]:
-    """Compute per-model performance stats."""
-    # Get distinct model names from predictions instead of hardcoded list
-    distinct = supabase.table("predictions").select("model_name").execute()
-    models = sorted({row["model_name"] for row in (distinct.data or [])})
-    results = []
-
-    # Pre-fetch all resolved consensus entries
-    resolved_consensus = (
-        supabase.table("consensus")
-        .select("market_id, is_correct")
-        .not_.is_("resolved_at", "null")
-        .execute()
-    )
-    resolved_map = {
-        c["market_id"]: c["is_correct"]
-        for c in (resolved_consensus.data or [])
-        if c.get("is_correct") is not None
+_by_model_cache: list[ModelPerformance] | None = None
+
+
+def invalidate_performance_cache():
+    """Per-model scores only change when a market resolves."""
+    global _by_model_cache
+    _by_model_cache = None
+
+
+def _score(agg: dict) -> dict:
+    graded = agg["correct"] + agg["incorrect"]
+    return {
+        "total_predictions": agg["total_predictions"],
+        "correct": agg["correct"],
+        "incorrect": agg["incorrect"],
+        "no_trade": agg["no_trade"],
+        "accuracy_pct": round(agg["correct"] / graded * 100, 1) if graded else 0,
+        "avg_confidence": (
+            round(agg["confidence_sum"] / agg["confidence_count"], 3) if agg["confidence_count"] else 0
+        ),
+        "scored": agg["scored"],
+        "brier_score": round(agg["brier_sum"] / agg["scored"], 4) if agg["scored"] else None,
+        "log_loss": round(agg["log_loss_sum"] / agg["scored"], 4) if agg["scored"] else None,
     }
 
-    for model_name in models:
-        preds = (
-            supabase.table("predictions")
-            .select("*")
-            .eq("model_name", model_name)
-            .execute()
+
+_SUMMED = (
+    "total_predictions", "no_trade", "correct", "incorrect",
+    "confidence_sum", "confidence_count", "scored", "brier_sum", "log_loss_sum",
+)
+
+
+async def compute_by_model() -> list[ModelPerformance]:
+    """Per-model accuracy, Brier score and log loss against the resolved market outcome.
+
+    One model_performance() RPC returns (model, category) aggregates; the
+    per-model totals are summed here. Cached until the next resolution.
+    """
+    global _by_model_cache
+
+    if _by_model_cache is not None:
+        return _by_model_cache
+
+    result = supabase.rpc("model_performance", {}).execute()
+
+    totals: dict[str, dict] = {}
+    categories: dict[str, list[dict]] = {}
+    for row in result.data or []:
+        name = row["model_name"]
+        total = totals.setdefault(name, dict.fromkeys(_SUMMED, 0))
+        for key in _SUMMED:
+            total[key] += row.get(key) or 0
+        categories.setdefault(name, []).append({"category": row["category"], **_score(row)})
+
+    _by_model_cache = [
+        ModelPerformance(
+            model_name=name,
+            **_score(totals[name]),
+            by_category=sorted(categories[name], key=lambda c: -c["total_predictions"]),
         )
+        for name in sorted(totals)
+    ]
+    return _by_model_cache
 
-        all_preds = preds.data or []
-        total = len(all_preds)
-        no_trade = sum(1 for p in all_preds if p.get("prediction") == "NO_TRADE")
-
-        correct = 0
-        incorrect = 0
-        for p in all_preds:
-            if p.get("prediction") == "NO_TRADE":
-                continue
-            market_id = p.get("market_id")
-            if market_id in resolved_map:
-                # Check if this prediction matches the market outcome
-                consensus_correct = resolved_map[market_id]
-                # The prediction is correct if it agrees with the consensus
-                # and the consensus was correct, OR disagrees and consensus was wrong.
-                # Simplification: we compare prediction to resolved outcome via consensus.
-                if consensus_correct:
-                    correct += 1
-                else:
-                    incorrect += 1
-
-        confs = [p.get("confidence", 0) for p in all_preds if p.get("confidence")]
-        avg_conf = sum(confs) / len(confs) if confs else 0
-
-        accuracy = (correct / (correct + incorrect) * 100) if (correct + incorrect) > 0 else 0
-
-        results.append(ModelPerformance(
-            model_name=model_name,
-            total_predictions=total,
-            correct=correct,
-            incorrect=incorrect,
-            no_trade=no_trade,
-            accuracy_pct=round(accuracy, 1),
-            avg_confidence=round(avg_conf, 3),
-        ))
 
-    return results
+_BUCKET_DAYS = {"day": 1, "week": 7, "month": 30.4}
 
 
-async def compute_pnl_history() -> list[PnlPoint]:
-    """Compute cumulative P&L time series."""
-    resolved = (
-        supabase.table("consensus")
-        .select("pnl, resolved_at")
-        .not_.is_("resolved_at", "null")
-        .order("resolved_at", desc=False)
-        .execute()
-    )
+def _pick_granularity(start: datetime | None, end: datetime | None, max_points: int) -> str:
+    """Finest bucket size whose count over the range fits max_points."""
+    if start is None:
+        first = (
+            supabase.table("consensus")
+            .select("resolved_at")
+            .not_.is_("resolved_at", "null")
+            .order("resolved_at", desc=False)
+            .limit(1)
+            .execute()
+        )
+        if not first.data:
+            return "day"
+        start = datetime.fromisoformat(first.data[0]["resolved_at"].replace("Z", "+00:00"))
+    span_days = ((end or datetime.now(timezone.utc)) - start).total_seconds() / 86400
+    for granularity, days in _BUCKET_DAYS.items():
+        if span_days / days <= max_points:
+            return granularity
+    return "month"
+
+
+def _merge_points(points: list[PnlPoint], max_points: int) -> list[PnlPoint]:
+    """Fold consecutive buckets together until at most max_points remain."""
+    if len(points) <= max_points:
+        return points
+    size = -(-len(points) // max_points)
+    merged = []
+    for i in range(0, len(points), size):
+        group = points[i:i + size]
+        period_pnl = round(sum(p.period_pnl for p in group), 2)
+        merged.append(PnlPoint(
+            date=group[0].date,
+            cumulative_pnl=group[-1].cumulative_pnl,
+            daily_pnl=period_pnl,
+            period_pnl=period_pnl,
+            resolved=sum(p.resolved for p in group),
+        ))
+    return merged
 
-    points = []
-    cumulative = 0.0
 
-    for entry in resolved.data or []:
-        pnl = entry.get("pnl", 0)
-        resolved_at = entry.get("resolved_at", "")
-        date_str = resolved_at[:10] if resolved_at else ""
+async def compute_pnl_history(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    granularity: str = "auto",
+    max_points: int = 365,
+) -> list[PnlPoint]:
+    """Cumulative P&L time series bucketed in SQL by day, week or month.
 
-        cumulative += pnl
+    "auto" picks the finest granularity that fits max_points over the range;
+    anything still over max_points is merged into wider buckets.
+    """
+    if granularity == "auto":
+        granularity = _pick_granularity(start, end, max_points)
+
+    result = supabase.rpc(
+        "pnl_history",
+        {
+            "p_from": start.isoformat() if start else None,
+            "p_to": end.isoformat() if end else None,
+            "p_granularity": granularity,
+        },
+    ).execute()
+
+    points = []
+    for row in result.data or []:
+        period_pnl = round(row.get("pnl") or 0, 2)
         points.append(PnlPoint(
-            date=date_str,
-            cumulative_pnl=round(cumulative, 2),
-            daily_pnl=round(pnl, 2),
+            date=(row.get("bucket") or "")[:10],
+            cumulative_pnl=round(row.get("cumulative_pnl") or 0, 2),
+            # Kept for existing clients; it holds the bucket's P&L
+            daily_pnl=period_pnl,
+            period_pnl=period_pnl,
+            resolved=row.get("resolved") or 0,
         ))
 
-    return points
+    return _merge_points(points, max_points)
@@ -1,6 +1,9 @@
+from datetime import datetime, timezone
+
 import httpx
 from app.config import settings
 from app.database import supabase
+from app.services.question_index import add_market
 from app.utils.logger import log
 
 GAMMA_BASE = settings.polymarket_gamma_url
@@ -66,12 +69,8 @@ async def fetch_market_prices(polymarket_id: str) -> list[float] | None:
     return None
 
 
-async def check_market_resolution(polymarket_id: str) -> str | None:
-    """Check if a market has been resolved on Polymarket. Returns outcome or None."""
-    market = await fetch_market_by_id(polymarket_id)
-    if not market:
-        return None
-
+def resolution_outcome(market: dict) -> str | None:
+    """Winning outcome of a raw Gamma market, or None while it is unresolved."""
     if market.get("closed") and market.get("resolved"):
         # Determine winning outcome
         prices = market.get("outcomePrices")
@@ -94,6 +93,64 @@ async def check_market_resolution(polymarket_id: str) -> str | None:
     return None
 
 
+async def check_market_resolution(polymarket_id: str) -> str | None:
+    """Check if a market has been resolved on Polymarket. Returns outcome or None."""
+    market = await fetch_market_by_id(polymarket_id)
+    if not market:
+        return None
+    return resolution_outcome(market)
+
+
+def parse_timestamp(value) -> datetime | None:
+    """Parse a Gamma timestamp to aware UTC; precision and offset format vary."""
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+async def fetch_closed_markets_since(
+    since: datetime | None, page_size: int = 500, max_pages: int = 20, offset: int = 0
+):
+    """Page through closed markets, most recently updated first, down to since.
+
+    Yields one page (list of raw markets) at a time, starting offset markets
+    into the feed; stops at the first market whose updatedAt is older than
+    since, or after max_pages. A caller that receives max_pages full pages
+    has not necessarily reached since.
+    """
+    async with httpx.AsyncClient(timeout=30) as client:
+        for page in range(max_pages):
+            resp = await client.get(
+                f"{GAMMA_BASE}/markets",
+                params={
+                    "closed": "true",
+                    "limit": page_size,
+                    "offset": offset + page * page_size,
+                    "order": "updatedAt",
+                    "ascending": "false",
+                },
+            )
+            resp.raise_for_status()
+            markets = resp.json()
+            if since:
+                fresh = []
+                for m in markets:
+                    updated_at = parse_timestamp(m.get("updatedAt"))
+                    if updated_at is not None and updated_at < since:
+                        break
+                    fresh.append(m)
+            else:
+                fresh = markets
+            if fresh:
+                yield fresh
+            if len(fresh) < len(markets) or len(markets) < page_size:
+                return
+
+
 async def upsert_markets(raw_markets: list[dict]) -> int:
     """Upsert markets from Gamma API into the database. Returns count of new markets."""
     import json
@@ -152,6 +209,7 @@ async def upsert_markets(raw_markets: list[dict]) -> int:
             )
             if result.data:
                 new_count += 1
+                add_market(result.data[0]["id"], question)
         except Exception as e:
             log.error("market_upsert_error", polymarket_id=polymarket_id, error=str(e))
 
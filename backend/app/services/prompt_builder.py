@@ -1,10 +1,11 @@
+import re
 from datetime import datetime, timezone
 
 
-def _get_system_prompt() -> str:
-    current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    return f"""You are an aggressive prediction market trader. You MUST take a position on every market.
-Today's date: {current_date}
+# Static instructions shared by every market and model. Nothing volatile (date,
+# prices, research) may go in here: providers cache prompts by exact prefix, so
+# this text must stay byte-identical for the life of the process.
+_INSTRUCTIONS = """You are an aggressive prediction market trader. You MUST take a position on every market.
 
 ## CRITICAL RULES
 1. You MUST answer YES or NO. Always pick a side.
@@ -14,7 +15,7 @@ Today's date: {current_date}
 
 ## How to analyze
 1. Read the web research carefully — it contains current real-world information
-2. Estimate the TRUE probability of YES happening based on all evidence
+2. Estimate the TRUE probability of YES happening based on all evidence, as of today's date given in the market message
 3. Set your confidence: this is YOUR estimated probability (0.0 to 1.0)
 4. Compare to the market price — the system will handle edge/EV math separately
 5. Pick YES if your probability > 0.5, pick NO if your probability < 0.5
@@ -23,67 +24,260 @@ Today's date: {current_date}
 - confidence 0.95 = you believe 95% chance this happens
 - confidence 0.7 = you believe 70% chance
 - confidence 0.5 = true coin flip (still pick a side if you have any lean)
+- If your probability > 50%, predict YES with confidence = your probability
+- If your probability < 50%, predict NO with confidence = (1 - your probability)
+- DO NOT default to NO_TRADE. You must pick a side.
+
+The system will decide whether to actually trade based on EV math. Your job is just to PREDICT accurately.
 
 You MUST respond with valid JSON only, no markdown, no explanation outside JSON."""
 
+SYSTEM_PROMPT = _INSTRUCTIONS + """
+
+## Response format
+{"prediction": "YES" | "NO", "confidence": <0.0-1.0>, "reasoning": "<brief analysis citing specific evidence>"}"""
+
+# Sent as response_format to models flagged supports_structured_output
+PREDICTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "prediction",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "prediction": {"type": "string", "enum": ["YES", "NO", "NO_TRADE"]},
+                "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                "reasoning": {"type": "string"},
+            },
+            "required": ["prediction", "confidence", "reasoning"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+BATCH_SYSTEM_PROMPT = _INSTRUCTIONS + """
+
+## Batch mode
+You will receive several independent markets, each headed by its market_id.
+Judge each market on its own evidence. Respond with a JSON array containing exactly
+one object per market, in any order, and nothing else:
+[{"market_id": "<id>", "prediction": "YES" | "NO", "confidence": <0.0-1.0>, "reasoning": "<one sentence>"}]"""
+
+
+EVENT_SYSTEM_PROMPT = _INSTRUCTIONS + """
+
+## Event mode
+You will receive several sibling markets from the same event (for example a list of
+candidates or a ladder of price thresholds), each headed by its market_id, plus research
+covering the whole event. Your probabilities must be consistent across siblings:
+- If the siblings are mutually exclusive outcomes, their YES probabilities must sum to at most 1.
+- If the siblings are thresholds on the same quantity, probabilities must be monotonic in the threshold.
+Respond with a JSON array containing exactly one object per market, and nothing else:
+[{"market_id": "<id>", "prediction": "YES" | "NO", "confidence": <0.0-1.0>, "reasoning": "<one sentence>"}]"""
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_DATE_RE = re.compile(
+    r"\b(?:19|20)\d{2}\b"
+    r"|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b",
+    re.IGNORECASE,
+)
+_NUMBER_RE = re.compile(r"\d")
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline token estimate for budgeting (no tokenizer or network call).
+
+    Blends the ~4 chars/token rule with a word/punctuation count, which tracks
+    BPE tokenizers better on number- and symbol-heavy research text.
+    """
+    if not text:
+        return 0
+    return max(len(text) // 4, int(len(_WORD_RE.findall(text)) * 0.75)) + 1
 
-# Keep a module-level reference for backwards compat with _call_model
-SYSTEM_PROMPT = _get_system_prompt()
+
+def _segments(text: str) -> list[str]:
+    segments = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            segments.extend(p.strip() for p in _SENTENCE_SPLIT_RE.split(line) if p.strip())
+    return segments
+
+
+def _segment_key(segment: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", segment.lower()).split())
+
+
+def _segment_score(segment: str) -> int:
+    score = 0
+    if _DATE_RE.search(segment):
+        score += 2
+    if _NUMBER_RE.search(segment):
+        score += 1
+    return score
+
+
+def compress_text(text: str, budget_tokens: int) -> str:
+    """Fit text into budget_tokens by dropping duplicate and low-value sentences.
+
+    Sentences carrying dates score highest, then ones carrying numbers; ties
+    keep earlier sentences. Kept sentences are emitted in their original order.
+    """
+    if not text or estimate_tokens(text) <= budget_tokens:
+        return text
+
+    unique: list[tuple[int, str, int]] = []
+    seen: set[str] = set()
+    for i, segment in enumerate(_segments(text)):
+        key = _segment_key(segment)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        unique.append((i, segment, estimate_tokens(segment)))
+
+    kept: list[tuple[int, str]] = []
+    used = 0
+    for i, segment, tokens in sorted(unique, key=lambda u: (-_segment_score(u[1]), u[0])):
+        if used + tokens <= budget_tokens:
+            kept.append((i, segment))
+            used += tokens
+
+    if not kept and unique:
+        # Budget smaller than any single sentence: hard-truncate the best one
+        i, segment, _ = min(unique, key=lambda u: (-_segment_score(u[1]), u[0]))
+        kept.append((i, segment[: budget_tokens * 4]))
+
+    return "\n".join(segment for _, segment in sorted(kept))
+
+
+def _time_remaining(end_date) -> str:
+    if not end_date:
+        return "Unknown"
+    try:
+        if isinstance(end_date, str):
+            end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+        else:
+            end_dt = end_date
+        now = datetime.now(timezone.utc)
+        delta = end_dt - now
+        days = delta.days
+        if days > 0:
+            return f"{days} days"
+        elif delta.total_seconds() > 0:
+            hours = int(delta.total_seconds() / 3600)
+            return f"{hours} hours"
+        return "Expired"
+    except Exception:
+        return "Unknown"
+
+
+def _format_prices(market: dict) -> tuple[str, str]:
+    prices = market.get("outcome_prices", [])
+    yes_price = f"{prices[0]:.2%}" if len(prices) > 0 else "N/A"
+    no_price = f"{prices[1]:.2%}" if len(prices) > 1 else "N/A"
+    return yes_price, no_price
+
+
+def build_budgeted_prompt(
+    market: dict,
+    research_context: str = "",
+    research_budget: int = 800,
+    description_budget: int = 300,
+) -> tuple[str, dict]:
+    """Build the prediction prompt with research and description fitted to token budgets.
+
+    Returns the prompt and a token report ({"tokens_before", "tokens_after"}).
+    The prompt is shared by every model, so compression happens once per market.
+    """
+    full_prompt = build_prediction_prompt(market, research_context=research_context)
+
+    trimmed_market = {**market, "description": compress_text(market.get("description") or "", description_budget)}
+    prompt = build_prediction_prompt(
+        trimmed_market,
+        research_context=compress_text(research_context, research_budget),
+    )
+    return prompt, {"tokens_before": estimate_tokens(full_prompt), "tokens_after": estimate_tokens(prompt)}
 
 
 def build_prediction_prompt(market: dict, research_context: str = "") -> str:
     question = market.get("question", "")
     description = market.get("description", "")
-    prices = market.get("outcome_prices", [])
     volume = market.get("volume", 0)
     liquidity = market.get("liquidity", 0)
     end_date = market.get("end_date", "")
 
-    # Calculate time remaining
-    time_remaining = "Unknown"
-    if end_date:
-        try:
-            if isinstance(end_date, str):
-                end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-            else:
-                end_dt = end_date
-            now = datetime.now(timezone.utc)
-            delta = end_dt - now
-            days = delta.days
-            if days > 0:
-                time_remaining = f"{days} days"
-            elif delta.total_seconds() > 0:
-                hours = int(delta.total_seconds() / 3600)
-                time_remaining = f"{hours} hours"
-            else:
-                time_remaining = "Expired"
-        except Exception:
-            pass
-
-    yes_price = f"{prices[0]:.2%}" if len(prices) > 0 else "N/A"
-    no_price = f"{prices[1]:.2%}" if len(prices) > 1 else "N/A"
-
+    time_remaining = _time_remaining(end_date)
+    yes_price, no_price = _format_prices(market)
     research_section = research_context if research_context else "No recent research available. Use your best judgment from training data."
 
+    # Most stable content first, volatile prices/time/date last
     return f"""## Market
 **Question:** {question}
 **Description:** {description}
 
+## Web Research (current real-world info)
+{research_section}
+
 ## Current Prices
 - YES: {yes_price} | NO: {no_price}
 - Volume: ${volume:,.0f} | Liquidity: ${liquidity:,.0f}
 - Time remaining: {time_remaining} (ends {end_date})
+- Today's date: {_today()}
 
-## Web Research (current real-world info)
-{research_section}
+Based on ALL the evidence above, what is the TRUE probability that this resolves YES?
+Respond ONLY with valid JSON in the response format from your instructions."""
+
+
+def build_batch_market_block(market: dict) -> str:
+    """One market's section in a batched screening prompt (no web research)."""
+    description = (market.get("description") or "")[:500]
+    volume = market.get("volume", 0)
+    end_date = market.get("end_date", "")
+    yes_price, no_price = _format_prices(market)
+
+    return f"""### market_id: {market["id"]}
+**Question:** {market.get("question", "")}
+**Description:** {description}
+- YES: {yes_price} | NO: {no_price} | Volume: ${volume:,.0f}
+- Time remaining: {_time_remaining(end_date)} (ends {end_date})"""
+
+
+def build_batch_prediction_prompt(blocks: list[str]) -> str:
+    markets_section = "\n\n".join(blocks)
+    return f"""## Markets
+{markets_section}
+
+Today's date: {_today()}
 
 ## Your task
-Based on ALL the evidence above, what is the TRUE probability that this resolves YES?
-- If your probability > 50%, predict YES with confidence = your probability
-- If your probability < 50%, predict NO with confidence = (1 - your probability)
-- DO NOT default to NO_TRADE. You must pick a side.
+For EACH market above, estimate the TRUE probability that it resolves YES and pick a side.
+Respond ONLY with the JSON array described in your instructions, one object per market_id."""
 
-The system will decide whether to actually trade based on EV math. Your job is just to PREDICT accurately.
 
-Respond ONLY with valid JSON:
-{{"prediction": "YES" | "NO", "confidence": <0.0-1.0>, "reasoning": "<brief analysis citing specific evidence>"}}"""
+def build_event_prediction_prompt(event_slug: str, blocks: list[str], research_context: str = "") -> str:
+    """One prompt covering every sibling market of an event."""
+    markets_section = "\n\n".join(blocks)
+    research_section = research_context if research_context else "No recent research available. Use your best judgment from training data."
+
+    return f"""## Event: {event_slug}
+
+## Web Research (current real-world info, covers the whole event)
+{research_section}
+
+## Sibling markets
+{markets_section}
+
+Today's date: {_today()}
+
+## Your task
+For EACH sibling market above, estimate the TRUE probability that it resolves YES, keeping
+the probabilities consistent across siblings, and pick a side.
+Respond ONLY with the JSON array described in your instructions, one object per market_id."""
@@ -0,0 +1,241 @@
+import re
+import zlib
+
+import numpy as np
+
+from app.database import supabase
+from app.utils.logger import log
+
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_SHINGLE = 5
+_PRIME = np.uint64((1 << 31) - 1)
+
+# Fixed seed so signatures are stable across processes
+_rng = np.random.default_rng(20260207)
+_A = _rng.integers(1, int(_PRIME), size=_NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), size=_NUM_PERM, dtype=np.uint64)
+
+# Unambiguous month names count on their own; "march"/"may" and abbreviations
+# only next to a day/year or after a preposition, so ordinary words stay words.
+_MONTH_RE = re.compile(
+    r"\b(?:(january|february|april|june|july|august|september|october|november|december)"
+    r"|(jan|feb|mar|march|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)\.?(?=\s+\d)"
+    r"|(?:in|by|before|after|until|of|on|end)\s+(march|may))\b",
+    re.IGNORECASE,
+)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*\s*[kmb%]?\b", re.IGNORECASE)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase and strip punctuation; numbers, years and dates are kept."""
+    return " ".join(re.sub(r"[^a-z0-9.%]+", " ", question.lower()).replace(". ", " ").split())
+
+
+def key_terms(question: str) -> tuple[str, ...]:
+    """Numbers (thresholds, years, days) and months, which must match for two
+    questions to be about the same thing: "BTC above $100k by Mar 31" and
+    "BTC above $50k by Jun 1" are near-duplicate text but different markets."""
+    text = question.lower()
+    numbers = [re.sub(r"[\s,]", "", m) for m in _NUMBER_RE.findall(text)]
+    months = [(m.group(1) or m.group(2) or m.group(3))[:3] for m in _MONTH_RE.finditer(text)]
+    return tuple(sorted(numbers + months))
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    if len(text) <= _SHINGLE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + _SHINGLE] for i in range(len(text) - _SHINGLE + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode()) & 0x7FFFFFFF for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+
+
+def minhash(question: str) -> np.ndarray:
+    """64-permutation MinHash signature of the question's character 5-shingles."""
+    hashes = _shingle_hashes(normalize_question(question))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+class QuestionIndex:
+    """In-memory MinHash/LSH index over market questions.
+
+    16 bands of 4 rows: pairs above ~0.5 Jaccard usually share a band
+    bucket; candidates are then ranked by estimated Jaccard similarity.
+    Markets with identical signatures (relisted questions) share one entry.
+    Each market's key_terms are kept so callers can insist on an exact match
+    of numbers and dates.
+    """
+
+    def __init__(self):
+        self._signatures: dict[str, bytes] = {}
+        self._arrays: dict[bytes, np.ndarray] = {}
+        self._members: dict[bytes, set[str]] = {}
+        self._buckets: dict[tuple[int, bytes], set[bytes]] = {}
+        self._terms: dict[str, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(_BANDS):
+            yield band, signature[band * _ROWS:(band + 1) * _ROWS].tobytes()
+
+    def add(self, market_id: str, question: str):
+        self.remove(market_id)
+        signature = minhash(question)
+        sig_key = signature.tobytes()
+        self._signatures[market_id] = sig_key
+        self._terms[market_id] = key_terms(question)
+        if sig_key not in self._members:
+            self._members[sig_key] = set()
+            self._arrays[sig_key] = signature
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(sig_key)
+        self._members[sig_key].add(market_id)
+
+    def remove(self, market_id: str):
+        sig_key = self._signatures.pop(market_id, None)
+        if sig_key is None:
+            return
+        self._terms.pop(market_id, None)
+        members = self._members[sig_key]
+        members.discard(market_id)
+        if members:
+            return
+        del self._members[sig_key]
+        for key in self._band_keys(self._arrays.pop(sig_key)):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(sig_key)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(
+        self,
+        question: str,
+        threshold: float = 0.7,
+        limit: int = 10,
+        exclude_id: str | None = None,
+        same_terms: bool = False,
+    ) -> list[tuple[str, float]]:
+        """Near-duplicates of question as [(market_id, similarity)], most similar first.
+
+        same_terms keeps only markets whose numbers and dates match exactly.
+        """
+        signature = minhash(question)
+        terms = key_terms(question) if same_terms else None
+        candidates: set[bytes] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        if not candidates:
+            return []
+
+        keys = list(candidates)
+        similarities = (np.stack([self._arrays[k] for k in keys]) == signature).mean(axis=1)
+
+        results: list[tuple[str, float]] = []
+        for i in np.argsort(-similarities, kind="stable"):
+            similarity = float(similarities[i])
+            if similarity < threshold or len(results) >= limit:
+                break
+            for market_id in self._members[keys[i]]:
+                if market_id != exclude_id and (terms is None or self._terms.get(market_id) == terms):
+                    results.append((market_id, round(similarity, 4)))
+                    if len(results) >= limit:
+                        break
+        return results
+
+
+_index = QuestionIndex()
+_loaded = False
+
+
+def ensure_loaded(page_size: int = 1000):
+    """Build the index from all markets once per process, then stay incremental."""
+    global _loaded
+
+    if _loaded:
+        return
+
+    offset = 0
+    while True:
+        page = (
+            supabase.table("markets")
+            .select("id, question")
+            .order("created_at", desc=False)
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        rows = page.data or []
+        for row in rows:
+            if row.get("question"):
+                _index.add(row["id"], row["question"])
+        if len(rows) < page_size:
+            break
+        offset += page_size
+    _loaded = True
+    log.info("question_index_loaded", markets=len(_index))
+
+
+def add_market(market_id: str, question: str):
+    """Incremental hook for upsert_markets; a no-op until the index is first used."""
+    if _loaded and question:
+        _index.add(market_id, question)
+
+
+def find_similar(
+    question: str,
+    threshold: float = 0.7,
+    limit: int = 10,
+    exclude_id: str | None = None,
+    same_terms: bool = False,
+) -> list[tuple[str, float]]:
+    ensure_loaded()
+    return _index.query(question, threshold=threshold, limit=limit, exclude_id=exclude_id, same_terms=same_terms)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark QuestionIndex build and query time")
+    parser.add_argument("--markets", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    words = (
+        "election trump biden btc eth price close above below fed rate cut win super bowl nba finals "
+        "champion team party senate house gdp inflation cpi oil gold stock apple tesla nvidia market cap "
+        "launch release movie box office"
+    ).split()
+    questions = []
+    for i in range(args.markets):
+        # A quarter are recurring price-threshold series, the rest free text
+        if i % 4 == 0:
+            questions.append(
+                f"Will {random.choice(['BTC', 'ETH', 'SOL', 'XRP', 'DOGE'])} close above "
+                f"${random.randint(1, 200)}k on {random.choice(['March', 'April', 'May'])} {random.randint(1, 28)}?"
+            )
+        else:
+            questions.append("Will " + " ".join(random.choices(words, k=random.randint(6, 12))) + "?")
+
+    index = QuestionIndex()
+    start = time.perf_counter()
+    for i, q in enumerate(questions):
+        index.add(str(i), q)
+    build = time.perf_counter() - start
+
+    sample = random.sample(questions, min(args.queries, len(questions)))
+    start = time.perf_counter()
+    for q in sample:
+        index.query(q, threshold=0.8, limit=10)
+    query = (time.perf_counter() - start) / len(sample)
+
+    print(f"markets: {args.markets}  build: {build:.1f}s ({build / args.markets * 1e6:.0f}us/add)")
+    print(f"queries: {len(sample)}  avg: {query * 1000:.2f}ms")
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+from app.database import supabase
+from app.utils.logger import log
+
+# Upper edges (ms) of the latency histogram bins kept in llm_telemetry_hourly.
+# Must match the thresholds array in the rollup_llm_telemetry() trigger.
+LATENCY_BOUNDS_MS = [
+    100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+    7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000, 120000,
+]
+
+_buffer: list[dict] = []
+
+
+def record_llm_call(
+    model_name: str,
+    kind: str,
+    usage: dict | None,
+    latency_ms: int,
+    attempts: int = 1,
+    queue_ms: int = 0,
+    ok: bool = True,
+):
+    """Buffer one LLM call for the append-only telemetry table.
+
+    kind is one of "prediction", "screen", "batch_screen", "research".
+    Rows are written in bulk by flush_telemetry().
+    """
+    usage = usage or {}
+    _buffer.append({
+        "model_name": model_name,
+        "kind": kind,
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "cached_tokens": usage.get("cached_tokens"),
+        "cost": usage.get("cost"),
+        "attempts": attempts,
+        "latency_ms": max(int(latency_ms), 0),
+        "queue_ms": max(int(queue_ms), 0),
+        "ok": ok,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+
+async def flush_telemetry() -> int:
+    """Write buffered telemetry rows in one insert. Hourly rollups happen in a DB trigger."""
+    global _buffer
+
+    if not _buffer:
+        return 0
+    rows, _buffer = _buffer, []
+    try:
+        supabase.table("llm_call_telemetry").insert(rows).execute()
+        return len(rows)
+    except Exception as e:
+        log.error("telemetry_flush_error", rows=len(rows), error=str(e))
+        # Keep the rows for the next flush rather than losing them
+        _buffer = rows + _buffer
+        return 0
+
+
+def _percentile(hist: list[int], total: int, q: float, max_latency: int) -> int:
+    if total <= 0:
+        return 0
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(hist):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BOUNDS_MS[i] if i < len(LATENCY_BOUNDS_MS) else max_latency
+    return max_latency
+
+
+async def get_model_stats(hours: int = 24) -> list[dict]:
+    """Rolling latency percentiles, throughput and cost per model from hourly buckets."""
+    since = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+    result = (
+        supabase.table("llm_telemetry_hourly")
+        .select("*")
+        .gte("bucket_start", since.isoformat())
+        .execute()
+    )
+
+    merged: dict[str, dict] = {}
+    bins = len(LATENCY_BOUNDS_MS) + 1
+    for row in result.data or []:
+        m = merged.setdefault(row["model_name"], {
+            "calls": 0, "errors": 0, "attempts": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+            "cost": 0.0, "latency_ms_sum": 0, "latency_ms_max": 0, "queue_ms_sum": 0,
+            "latency_hist": [0] * bins,
+        })
+        for key in ("calls", "errors", "attempts", "prompt_tokens", "completion_tokens",
+                    "cached_tokens", "latency_ms_sum", "queue_ms_sum"):
+            m[key] += row.get(key) or 0
+        m["cost"] += row.get("cost") or 0
+        m["latency_ms_max"] = max(m["latency_ms_max"], row.get("latency_ms_max") or 0)
+        for i, count in enumerate((row.get("latency_hist") or [])[:bins]):
+            m["latency_hist"][i] += count
+
+    stats = []
+    for model_name, m in sorted(merged.items()):
+        calls = m["calls"]
+        hist, max_latency = m["latency_hist"], m["latency_ms_max"]
+        stats.append({
+            "model_name": model_name,
+            "window_hours": hours,
+            "calls": calls,
+            "errors": m["errors"],
+            "avg_attempts": round(m["attempts"] / calls, 3) if calls else 0,
+            "p50_latency_ms": _percentile(hist, calls, 0.50, max_latency),
+            "p95_latency_ms": _percentile(hist, calls, 0.95, max_latency),
+            "p99_latency_ms": _percentile(hist, calls, 0.99, max_latency),
+            "avg_latency_ms": round(m["latency_ms_sum"] / calls) if calls else 0,
+            "avg_queue_ms": round(m["queue_ms_sum"] / calls) if calls else 0,
+            "calls_per_hour": round(calls / hours, 2),
+            "prompt_tokens": m["prompt_tokens"],
+            "completion_tokens": m["completion_tokens"],
+            "cached_tokens": m["cached_tokens"],
+            "total_cost": round(m["cost"], 6),
+            "cost_per_call": round(m["cost"] / calls, 6) if calls else 0,
+        })
+    return stats
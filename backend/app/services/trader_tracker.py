@@ -1,7 +1,12 @@
+import asyncio
+import time
+import uuid
 from datetime import datetime, timezone
 
 import httpx
+from app.config import settings
 from app.database import supabase
+from app.utils.bulk import bulk_insert
 from app.utils.logger import log
 
 DATA_API_BASE = "https://data-api.polymarket.com"
@@ -123,19 +128,19 @@ async def untrack_trader(trader_id: str) -> bool:
         return False
 
 
-async def refresh_trader_trades(trader_id: str, wallet: str) -> int:
+async def refresh_trader_trades(trader_id: str, wallet: str, backfill: bool = False) -> int:
     """Refresh trades for a single trader. Returns count of new trades."""
-    return await _ingest_trades(trader_id, wallet)
+    return await _ingest_trades(trader_id, wallet, backfill=backfill)
 
 
 async def refresh_trader_profile(trader_id: str, wallet: str) -> dict | None:
     """Refresh profile info and stats for a single trader."""
     try:
-        profile = await fetch_trader_profile(wallet)
+        # Profile and positions are independent upstream calls
+        profile, stats = await asyncio.gather(fetch_trader_profile(wallet), _compute_wallet_stats(wallet))
         if not profile:
             return None
 
-        stats = await _compute_wallet_stats(wallet)
         row = {
             "username": profile.get("userName"),
             "profile_image": profile.get("profileImage"),
@@ -158,16 +163,109 @@ async def refresh_trader_profile(trader_id: str, wallet: str) -> dict | None:
         return None
 
 
-async def refresh_all_tracked_traders() -> int:
-    """Refresh profile and trades for all tracked traders."""
-    result = supabase.table("tracked_traders").select("id, proxy_wallet").execute()
-    traders = result.data or []
-    refreshed = 0
-    for t in traders:
-        await refresh_trader_profile(t["id"], t["proxy_wallet"])
-        await _ingest_trades(t["id"], t["proxy_wallet"])
-        refreshed += 1
-    return refreshed
+async def refresh_trader(trader_id: str, wallet: str) -> dict:
+    """Refresh profile, stats and trades for one trader, fetching all three concurrently.
+
+    Returns a timing/result record for progress reporting.
+    """
+    started = time.monotonic()
+    profile, new_trades = await asyncio.gather(
+        refresh_trader_profile(trader_id, wallet),
+        _ingest_trades(trader_id, wallet),
+    )
+    return {
+        "trader_id": trader_id,
+        "proxy_wallet": wallet,
+        "ok": profile is not None,
+        "new_trades": new_trades,
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+
+
+# Recent refresh-all jobs by id, newest last
+_refresh_jobs: dict[str, dict] = {}
+_refresh_tasks: dict[str, asyncio.Task] = {}
+_MAX_JOBS = 20
+
+
+def _new_refresh_job(source: str) -> dict:
+    job = {
+        "id": uuid.uuid4().hex,
+        "source": source,
+        "status": "running",
+        "total": 0,
+        "completed": 0,
+        "failed": 0,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+        "elapsed_ms": 0,
+        "results": [],
+    }
+    _refresh_jobs[job["id"]] = job
+    while len(_refresh_jobs) > _MAX_JOBS:
+        del _refresh_jobs[next(iter(_refresh_jobs))]
+    return job
+
+
+async def refresh_all_tracked_traders(job: dict | None = None) -> int:
+    """Refresh profile and trades for all tracked traders.
+
+    Traders are refreshed concurrently, at most trader_refresh_concurrency at
+    a time; progress and per-trader timings are recorded on the job.
+    """
+    job = job or _new_refresh_job("scheduler")
+    started = time.monotonic()
+    try:
+        result = supabase.table("tracked_traders").select("id, proxy_wallet").execute()
+        traders = result.data or []
+        job["total"] = len(traders)
+        semaphore = asyncio.Semaphore(settings.trader_refresh_concurrency)
+
+        async def refresh_one(t: dict):
+            async with semaphore:
+                outcome = await refresh_trader(t["id"], t["proxy_wallet"])
+            job["results"].append(outcome)
+            job["completed"] += 1
+            if not outcome["ok"]:
+                job["failed"] += 1
+
+        await asyncio.gather(*(refresh_one(t) for t in traders))
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        log.error("refresh_all_error", job_id=job["id"], error=str(e))
+    finally:
+        job["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    timings = sorted(r["elapsed_ms"] for r in job["results"])
+    log.info(
+        "refresh_all_done",
+        job_id=job["id"],
+        traders=job["total"],
+        failed=job["failed"],
+        elapsed_ms=job["elapsed_ms"],
+        slowest_ms=timings[-1] if timings else 0,
+        median_ms=timings[len(timings) // 2] if timings else 0,
+    )
+    return job["completed"]
+
+
+def start_refresh_all_job() -> dict:
+    """Start a background refresh-all, or return the one already running."""
+    for job in reversed(_refresh_jobs.values()):
+        if job["status"] == "running":
+            return job
+    job = _new_refresh_job("api")
+    task = asyncio.create_task(refresh_all_tracked_traders(job))
+    _refresh_tasks[job["id"]] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(job["id"], None))
+    return job
+
+
+def get_refresh_job(job_id: str) -> dict | None:
+    return _refresh_jobs.get(job_id)
 
 
 async def get_tracked_traders(limit: int = 50, offset: int = 0) -> list[dict]:
@@ -183,7 +281,7 @@ async def get_tracked_traders(limit: int = 50, offset: int = 0) -> list[dict]:
 
 
 async def get_trader_detail(trader_id: str, auto_fetch: bool = False) -> dict | None:
-    """Get trader info with trade counts.
+    """Get trader info with its denormalized trade counters.
 
     When auto_fetch=True, fetches historical trades from the Polymarket
     API on-demand (used by refresh). Default is False for fast page loads.
@@ -202,8 +300,10 @@ async def get_trader_detail(trader_id: str, auto_fetch: bool = False) -> dict |
 
     # Auto-fetch historical trades from Polymarket (heavy, only on explicit refresh)
     if auto_fetch:
-        await _ingest_trades(trader["id"], trader["proxy_wallet"], limit=1000)
-        await refresh_trader_profile(trader["id"], trader["proxy_wallet"])
+        await asyncio.gather(
+            _ingest_trades(trader["id"], trader["proxy_wallet"], backfill=trader.get("backfilled_at") is None),
+            refresh_trader_profile(trader["id"], trader["proxy_wallet"]),
+        )
         refreshed = (
             supabase.table("tracked_traders")
             .select("*")
@@ -213,19 +313,8 @@ async def get_trader_detail(trader_id: str, auto_fetch: bool = False) -> dict |
         if refreshed.data:
             trader = refreshed.data[0]
 
-    # Just get counts, not full trade data
-    count_result = (
-        supabase.table("trader_trades")
-        .select("id, market_slug", count="exact")
-        .eq("trader_id", trader_id)
-        .execute()
-    )
-    trade_rows = count_result.data or []
-    market_slugs = {t["market_slug"] for t in trade_rows if t.get("market_slug")}
-
+    # trade_count / active_markets are kept on the row by the trader_trades triggers
     trader["trades"] = []
-    trader["trade_count"] = count_result.count or 0
-    trader["active_markets"] = len(market_slugs)
     return trader
 
 
@@ -248,59 +337,145 @@ async def get_trader_trades(
 
 async def get_stats_summary() -> dict:
     """Get summary stats for all tracked traders."""
-    traders_result = (
-        supabase.table("tracked_traders").select("id, pnl, username").execute()
-    )
-    traders = traders_result.data or []
+    result = supabase.rpc("trader_stats_summary", {}).execute()
+    row = (result.data or [{}])[0]
+    return {
+        "total_tracked": row.get("total_tracked") or 0,
+        "total_trades": row.get("total_trades") or 0,
+        "avg_pnl": round(row.get("avg_pnl") or 0, 2),
+        "top_trader": row.get("top_trader"),
+    }
+
 
-    trades_result = supabase.table("trader_trades").select("id", count="exact").execute()
-    total_trades = trades_result.count or 0
+async def reconcile_trader_counters() -> int:
+    """Rebuild the trigger-maintained trade counters from trader_trades.
 
-    pnls = [t["pnl"] for t in traders if t.get("pnl")]
-    avg_pnl = sum(pnls) / len(pnls) if pnls else 0
+    Returns the number of traders whose counters had drifted.
+    """
+    try:
+        result = supabase.rpc("reconcile_trader_counters", {}).execute()
+        fixed = result.data or 0
+        log.info("trader_counters_reconciled", fixed=fixed)
+        return fixed
+    except Exception as e:
+        log.error("trader_counters_reconcile_error", error=str(e))
+        return 0
 
-    top = max(traders, key=lambda t: t.get("pnl", 0)) if traders else None
-    top_trader = top.get("username") or top.get("id") if top else None
 
+def _trade_row(trader_id: str, wallet: str, t: dict) -> dict | None:
+    tx_hash = t.get("transactionHash")
+    traded_at = _parse_timestamp(t.get("createdAt") or t.get("timestamp"))
+    if not tx_hash or not traded_at:
+        return None
     return {
-        "total_tracked": len(traders),
-        "total_trades": total_trades,
-        "avg_pnl": round(avg_pnl, 2),
-        "top_trader": top_trader,
+        "trader_id": trader_id,
+        "proxy_wallet": wallet,
+        "side": t.get("side", "BUY"),
+        "condition_id": t.get("conditionId"),
+        "market_title": t.get("title") or t.get("marketTitle"),
+        "market_slug": t.get("marketSlug") or t.get("slug"),
+        "outcome": t.get("outcome"),
+        "size": float(t.get("size", 0) or 0),
+        "price": float(t.get("price", 0) or 0),
+        "transaction_hash": tx_hash,
+        "traded_at": traded_at,
     }
 
 
-async def _ingest_trades(trader_id: str, wallet: str, limit: int = 200) -> int:
-    """Fetch and upsert trades for a trader. Returns count of new trades."""
+def _as_datetime(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+async def _ingest_trades(trader_id: str, wallet: str, backfill: bool = False) -> int:
+    """Fetch and insert a trader's trades newer than their high-water mark.
+
+    Pages newest-first and stops at the first already-known trade (the stored
+    last_trade_hash, or anything older than last_trade_at). With backfill,
+    the mark is ignored and history is paged to the end once. Returns the
+    number of trades actually inserted.
+    """
     try:
-        raw_trades = await fetch_trader_trades(wallet, limit=limit)
-        new_count = 0
-        for t in raw_trades:
-            tx_hash = t.get("transactionHash")
-            if not tx_hash:
-                continue
-            row = {
-                "trader_id": trader_id,
-                "proxy_wallet": wallet,
-                "side": t.get("side", "BUY"),
-                "condition_id": t.get("conditionId"),
-                "market_title": t.get("title") or t.get("marketTitle"),
-                "market_slug": t.get("marketSlug") or t.get("slug"),
-                "outcome": t.get("outcome"),
-                "size": float(t.get("size", 0) or 0),
-                "price": float(t.get("price", 0) or 0),
-                "transaction_hash": tx_hash,
-                "traded_at": _parse_timestamp(t.get("createdAt") or t.get("timestamp")),
-            }
-            if not row["traded_at"]:
-                continue
-            try:
-                supabase.table("trader_trades").upsert(
-                    row, on_conflict="transaction_hash"
-                ).execute()
-                new_count += 1
-            except Exception as e:
-                log.warning("trade_upsert_skip", tx=tx_hash, error=str(e))
+        mark = (
+            supabase.table("tracked_traders")
+            .select("last_trade_at, last_trade_hash")
+            .eq("id", trader_id)
+            .execute()
+        )
+        mark = mark.data[0] if mark.data else {}
+        last_hash = None if backfill else mark.get("last_trade_hash")
+        last_at = None if backfill else _as_datetime(mark.get("last_trade_at"))
+        if backfill:
+            max_pages = settings.trade_backfill_max_pages
+        elif last_at is None:
+            # First ingest without a backfill: just the latest page
+            max_pages = 1
+        else:
+            max_pages = settings.trade_max_pages
+
+        rows: dict[str, dict] = {}
+        newest: tuple[datetime, dict] | None = None
+        reached_known = reached_end = False
+        page_size = settings.trade_page_size
+        for page in range(max_pages):
+            raw_trades = await fetch_trader_trades(wallet, limit=page_size, offset=page * page_size)
+            for t in raw_trades:
+                row = _trade_row(trader_id, wallet, t)
+                if row is None:
+                    continue
+                traded_at = _as_datetime(row["traded_at"])
+                if row["transaction_hash"] == last_hash or (last_at and traded_at and traded_at < last_at):
+                    reached_known = True
+                    break
+                rows.setdefault(row["transaction_hash"], row)
+                if traded_at and (newest is None or traded_at > newest[0]):
+                    newest = (traded_at, row)
+            reached_end = len(raw_trades) < page_size
+            if reached_known or reached_end:
+                break
+
+        # ON CONFLICT DO NOTHING only returns the rows actually inserted. A
+        # transient failure raises here, before the mark moves, so the next
+        # run re-reads these trades; the duplicates are ignored on insert.
+        new_count, failed = bulk_insert(
+            "trader_trades", list(rows.values()), on_conflict="transaction_hash",
+            chunk_size=settings.trade_insert_chunk_size,
+        )
+        if failed:
+            # Only rows the database rejected for their data end up here; they
+            # would fail again on retry, so the mark may move past them
+            log.warning(
+                "trades_dropped",
+                trader_id=trader_id,
+                transaction_hashes=[f["row"].get("transaction_hash") for f in failed[:20]],
+            )
+
+        # Stopping at trade_max_pages before the old mark leaves trades between
+        # it and the last page unread: keep the mark so the next run re-reads them
+        update = {}
+        gap = not (reached_known or reached_end or backfill or last_at is None)
+        if gap:
+            log.warning("trade_ingest_gap", trader_id=trader_id, pages=max_pages)
+        elif newest is not None:
+            update = {"last_trade_at": newest[1]["traded_at"], "last_trade_hash": newest[1]["transaction_hash"]}
+        if backfill:
+            update["backfilled_at"] = datetime.now(timezone.utc).isoformat()
+        if update:
+            supabase.table("tracked_traders").update(update).eq("id", trader_id).execute()
+
+        log.info(
+            "trades_ingested",
+            trader_id=trader_id,
+            fetched=len(rows),
+            inserted=new_count,
+            failed=len(failed),
+            backfill=backfill,
+            reached_known=reached_known,
+        )
         return new_count
     except Exception as e:
         log.error("ingest_trades_error", trader_id=trader_id, error=str(e))
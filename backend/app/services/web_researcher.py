@@ -3,7 +3,10 @@ import time
 from openai import AsyncOpenAI
 
 from app.config import settings
+from app.services import budget_governor
+from app.services.telemetry import record_llm_call
 from app.utils.logger import log
+from app.utils.usage import USAGE_EXTRA_BODY, extract_usage
 
 _client = AsyncOpenAI(
     base_url="https://openrouter.ai/api/v1",
@@ -21,14 +24,14 @@ _RESEARCH_PROMPT = (
 )
 
 
-async def research_market(question: str, description: str) -> str:
+async def research_market(question: str, description: str) -> tuple[str, float]:
     """Call Perplexity sonar-pro via OpenRouter to gather current web context.
 
-    Returns the research summary, or empty string on failure.
+    Returns (summary, cost in dollars), or ("", 0.0) on failure.
     """
     if not settings.web_research_enabled:
         log.info("web_research_skipped", reason="disabled")
-        return ""
+        return "", 0.0
 
     start = time.monotonic()
     try:
@@ -45,9 +48,14 @@ async def research_market(question: str, description: str) -> str:
             ],
             temperature=0.2,
             max_tokens=2000,
+            extra_body=USAGE_EXTRA_BODY,
         )
         summary = resp.choices[0].message.content or ""
         elapsed_ms = int((time.monotonic() - start) * 1000)
+        usage = extract_usage(resp)
+        if usage["cost"] is None:
+            usage["cost"] = budget_governor.actual_cost(settings.web_research_model, usage)
+        record_llm_call(settings.web_research_model, "research", usage, latency_ms=elapsed_ms)
 
         log.info(
             "web_research_complete",
@@ -55,14 +63,16 @@ async def research_market(question: str, description: str) -> str:
             length=len(summary),
             elapsed_ms=elapsed_ms,
         )
-        return summary.strip()
+        cost = usage["cost"] if usage["cost"] is not None else settings.cascade_research_cost_usd
+        return summary.strip(), cost
 
     except Exception as e:
         elapsed_ms = int((time.monotonic() - start) * 1000)
+        record_llm_call(settings.web_research_model, "research", None, latency_ms=elapsed_ms, ok=False)
         log.error(
             "web_research_failed",
             question=question[:80],
             error=str(e),
             elapsed_ms=elapsed_ms,
         )
-        return ""
+        return "", 0.0
@@ -0,0 +1,87 @@
+from postgrest.exceptions import APIError
+
+from app.database import supabase
+from app.utils.logger import log
+
+_CHUNK = 500
+
+
+def bulk_update(table: str, rows: list[dict], key: str = "id") -> dict[str, str]:
+    """Apply row-specific partial updates through the bulk_update RPC.
+
+    Each row holds its key column plus the columns to set; rows may set
+    different columns. Returns {key: error} for rows that failed; a failed
+    request marks every row in its chunk as failed.
+    """
+    errors: dict[str, str] = {}
+    for start in range(0, len(rows), _CHUNK):
+        chunk = rows[start:start + _CHUNK]
+        try:
+            result = supabase.rpc("bulk_update", {"p_table": table, "p_key": key, "p_rows": chunk}).execute()
+            for failure in result.data or []:
+                errors[failure["row_key"]] = failure["error"]
+        except Exception as e:
+            for row in chunk:
+                errors[str(row.get(key))] = str(e)
+
+    if errors:
+        log.error(
+            "bulk_update_errors",
+            table=table,
+            rows=len(rows),
+            failed=len(errors),
+            sample=dict(list(errors.items())[:5]),
+        )
+    return errors
+
+
+def _is_data_error(e: Exception) -> bool:
+    """True for errors the rows themselves cause (SQLSTATE class 22 data
+    exception or 23 integrity violation), which would fail again on retry."""
+    return isinstance(e, APIError) and str(e.code or "")[:2] in ("22", "23")
+
+
+def _insert_chunk(table: str, rows: list[dict], on_conflict: str, failed: list[dict]) -> int:
+    try:
+        result = (
+            supabase.table(table)
+            .upsert(rows, on_conflict=on_conflict, ignore_duplicates=True)
+            .execute()
+        )
+        return len(result.data or [])
+    except Exception as e:
+        if not _is_data_error(e):
+            # Timeouts, 5xx, resets: not the rows' fault, so let the caller retry
+            raise
+        if len(rows) == 1:
+            failed.append({"row": rows[0], "error": str(e)})
+            return 0
+        # Bisect to isolate the bad rows without losing the good ones
+        mid = len(rows) // 2
+        return (
+            _insert_chunk(table, rows[:mid], on_conflict, failed)
+            + _insert_chunk(table, rows[mid:], on_conflict, failed)
+        )
+
+
+def bulk_insert(table: str, rows: list[dict], on_conflict: str, chunk_size: int = _CHUNK) -> tuple[int, list[dict]]:
+    """Insert rows in chunks, skipping ones that conflict on on_conflict.
+
+    A chunk rejected for its data is bisected down to the offending rows, so
+    one bad row costs O(log n) extra requests rather than the whole batch.
+    Any other error is raised; chunks already written stay written. Returns
+    (rows inserted, [{"row", "error"}] for rows the database rejected).
+    """
+    failed: list[dict] = []
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        inserted += _insert_chunk(table, rows[start:start + chunk_size], on_conflict, failed)
+    if failed:
+        log.error(
+            "bulk_insert_errors",
+            table=table,
+            rows=len(rows),
+            failed=len(failed),
+            sample=[f["error"] for f in failed[:3]],
+        )
+    return inserted, failed
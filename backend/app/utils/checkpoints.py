@@ -0,0 +1,19 @@
+from app.database import supabase
+from app.utils.logger import log
+
+
+def get_checkpoint(name: str) -> str | None:
+    """Last persisted high-water mark for an incremental sync, or None."""
+    try:
+        result = supabase.table("sync_checkpoints").select("value").eq("name", name).execute()
+        return result.data[0]["value"] if result.data else None
+    except Exception as e:
+        log.warning("checkpoint_read_error", name=name, error=str(e))
+        return None
+
+
+def set_checkpoint(name: str, value: str):
+    try:
+        supabase.table("sync_checkpoints").upsert({"name": name, "value": value}, on_conflict="name").execute()
+    except Exception as e:
+        log.error("checkpoint_write_error", name=name, error=str(e))
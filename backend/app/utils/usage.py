@@ -0,0 +1,26 @@
+from typing import Any
+
+# Ask OpenRouter to include token accounting (and cost) in every response
+USAGE_EXTRA_BODY = {"usage": {"include": True}}
+
+
+def extract_usage(resp: Any) -> dict:
+    """Pull token counts from a chat completion's usage block.
+
+    cached_tokens and cost are only reported by some providers; they stay None
+    when absent rather than being guessed.
+    """
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return {"prompt_tokens": None, "completion_tokens": None, "cached_tokens": None, "cost": None}
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    cost = getattr(usage, "cost", None)
+
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_tokens": cached,
+        "cost": float(cost) if cost is not None else None,
+    }
@@ -17,8 +17,12 @@ async def update_odds():
         if not active.data:
             return
 
+        from app.services.consensus_engine import recompute_all_consensus
+        from app.services.odds_history import record_prices
         from app.services.polymarket import fetch_market_prices
+        from app.workers.reprediction_scheduler import on_price_update
 
+        fresh_prices: dict[str, list[float]] = {}
         for entry in active.data:
             market_data = entry.get("markets", {})
             polymarket_id = market_data.get("polymarket_id")
@@ -28,14 +32,17 @@ async def update_odds():
             try:
                 prices = await fetch_market_prices(polymarket_id)
                 if prices:
+                    fresh_prices[entry["market_id"]] = prices
                     # YES price is the first outcome price
-                    yes_price = prices[0] if prices else entry.get("current_odds", 0)
-                    supabase.table("consensus").update(
-                        {"current_odds": yes_price}
-                    ).eq("id", entry["id"]).execute()
+                    on_price_update(entry["market_id"], prices[0])
             except Exception as e:
                 log.error("odds_update_single_error", market_id=polymarket_id, error=str(e))
 
-        log.info("odds_updater_done", updated=len(active.data))
+        record_prices({market_id: prices[0] for market_id, prices in fresh_prices.items()})
+
+        # Re-score the whole open book (odds, EV, edge) in one pass
+        updated = await recompute_all_consensus(fresh_prices)
+
+        log.info("odds_updater_done", fetched=len(fresh_prices), updated=updated)
     except Exception as e:
         log.error("odds_updater_error", error=str(e))
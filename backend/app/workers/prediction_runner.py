@@ -1,14 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
 from app.database import supabase
 from app.utils.logger import log
 
 
-async def run_predictions_for_market(market: dict) -> list[dict]:
+async def run_predictions_for_market(
+    market: dict, screen: dict | None = None, lane: str = "manual"
+) -> list[dict]:
     """Run all 3 LLM predictions for a single market and compute consensus."""
     from app.services.llm_predictor import get_all_predictions
-    from app.services.consensus_engine import compute_consensus
 
     log.info("prediction_runner_started", market_id=market["id"])
-    predictions = await get_all_predictions(market)
+    predictions = await get_all_predictions(market, screen=screen, lane=lane)
+    return await _store_and_score(market, predictions)
+
+
+async def run_predictions_for_event(event_slug: str, markets: list[dict], lane: str = "manual") -> int:
+    """Predict all sibling markets of an event together. Returns markets predicted."""
+    from app.services.llm_predictor import get_event_predictions
+
+    log.info("event_prediction_runner_started", event_slug=event_slug, markets=len(markets))
+    by_market = await get_event_predictions(event_slug, markets, lane=lane)
+
+    predicted = 0
+    for market in markets:
+        predictions = by_market.get(market["id"])
+        if predictions and await _store_and_score(market, predictions):
+            predicted += 1
+    return predicted
+
+
+async def _store_and_score(market: dict, predictions: list[dict]) -> list[dict]:
+    """Upsert predictions for a market, drop its predictions from models
+    outside this run, and recompute its consensus."""
+    from app.services.consensus_engine import compute_consensus
 
     # Store predictions
     stored = []
@@ -24,9 +50,26 @@ async def run_predictions_for_market(market: dict) -> list[dict]:
         except Exception as e:
             log.error("prediction_store_error", error=str(e), model=pred.get("model_name"))
 
+    # A partial panel (cascade or budget trimmed) replaces the whole set, so
+    # other models' older rows can't be mixed back in by recompute_all_consensus
+    if stored:
+        try:
+            (
+                supabase.table("predictions")
+                .delete()
+                .eq("market_id", market["id"])
+                .not_.in_("model_name", sorted({p["model_name"] for p in stored}))
+                .execute()
+            )
+        except Exception as e:
+            log.error("prediction_prune_error", market_id=market["id"], error=str(e))
+
     # Compute and store consensus
     if stored:
-        await compute_consensus(market, stored)
+        from app.workers.reprediction_scheduler import on_predicted
+
+        consensus = await compute_consensus(market, stored)
+        on_predicted(market, consensus)
 
     return stored
 
@@ -35,14 +78,18 @@ async def run_predictions_for_new_markets():
     """Find markets without predictions and run LLMs on them."""
     log.info("checking_for_new_markets_needing_predictions")
     try:
-        # Get active markets that don't have predictions yet
+        # Get active markets that don't have predictions yet; markets the
+        # cascade skipped recently stay out until the retry window passes
+        retry_cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.cascade_skip_retry_hours)
         markets = (
             supabase.table("markets")
             .select("*")
             .eq("status", "active")
+            .or_(f"cascade_skipped_at.is.null,cascade_skipped_at.lt.{retry_cutoff.isoformat()}")
             .execute()
         )
 
+        pending = []
         for market in markets.data or []:
             existing = (
                 supabase.table("predictions")
@@ -51,6 +98,30 @@ async def run_predictions_for_new_markets():
                 .execute()
             )
             if not existing.data:
-                await run_predictions_for_market(market)
+                pending.append(market)
+
+        # Sibling markets of one event are predicted together
+        if settings.event_batching_enabled:
+            events: dict[str, list[dict]] = {}
+            for market in pending:
+                if market.get("event_slug"):
+                    events.setdefault(market["event_slug"], []).append(market)
+            size = settings.event_batch_max_markets
+            for event_slug, siblings in events.items():
+                if len(siblings) < 2:
+                    continue
+                for i in range(0, len(siblings), size):
+                    await run_predictions_for_event(event_slug, siblings[i:i + size], lane="backlog")
+            batched = {m["id"] for siblings in events.values() if len(siblings) >= 2 for m in siblings}
+            pending = [m for m in pending if m["id"] not in batched]
+
+        # Screen all pending markets with batched prompts up front
+        screens = {}
+        if pending and settings.cascade_enabled and settings.batch_screen_enabled:
+            from app.services.llm_predictor import screen_markets
+            screens = await screen_markets(pending, lane="backlog")
+
+        for market in pending:
+            await run_predictions_for_market(market, screen=screens.get(market["id"]), lane="backlog")
     except Exception as e:
         log.error("prediction_runner_batch_error", error=str(e))
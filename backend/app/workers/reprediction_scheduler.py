@@ -0,0 +1,253 @@
+import heapq
+import math
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import supabase
+from app.utils.logger import log
+
+# Score weights. Each component is roughly normalised to [0, 1] first.
+_W_PRICE_MOVE = 3.0
+_W_PREDICTION_AGE = 1.0
+_W_RESEARCH_AGE = 1.0
+_W_EDGE = 2.0
+
+# Rescore everything held in memory (no DB access) at most this often, so
+# time-driven staleness surfaces for markets that get no price updates.
+_RESCORE_ALL_SECONDS = 3600
+
+
+class RepredictionQueue:
+    """Max-priority queue keyed by market_id with O(log n) updates.
+
+    Updates push a new heap entry and bump the market's version; stale
+    entries are skipped lazily on pop and compacted when they pile up.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, str]] = []
+        self._current: dict[str, tuple[float, int]] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def update(self, market_id: str, score: float):
+        self._version += 1
+        self._current[market_id] = (score, self._version)
+        heapq.heappush(self._heap, (-score, self._version, market_id))
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._heap = [(-s, v, m) for m, (s, v) in self._current.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, market_id: str):
+        self._current.pop(market_id, None)
+
+    def pop_top(self, n: int, min_score: float) -> list[tuple[str, float]]:
+        top = []
+        while self._heap and len(top) < n:
+            neg_score, version, market_id = self._heap[0]
+            current = self._current.get(market_id)
+            if current is None or current[1] != version:
+                heapq.heappop(self._heap)
+                continue
+            if -neg_score < min_score:
+                break
+            heapq.heappop(self._heap)
+            del self._current[market_id]
+            top.append((market_id, -neg_score))
+        return top
+
+
+_queue = RepredictionQueue()
+_features: dict[str, dict] = {}
+_bootstrapped = False
+_last_rescore_all: datetime | None = None
+
+
+def _parse_dt(value) -> datetime | None:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def score_market(f: dict, now: datetime | None = None) -> float:
+    """Value of re-predicting a market now; higher means more urgent.
+
+    Combines the price move since prediction, prediction and research age,
+    and the current model-vs-market edge, scaled up for markets close to
+    their end date and for high-volume markets.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    predicted_at = f.get("predicted_at")
+    age_hours = (now - predicted_at).total_seconds() / 3600 if predicted_at else settings.reprediction_stale_hours
+    if age_hours < settings.reprediction_min_age_hours:
+        return 0.0
+
+    current = f.get("current_odds")
+    predicted = f.get("prediction_odds")
+    move = abs(current - predicted) if current is not None and predicted is not None else 0.0
+
+    research_at = f.get("web_research_at")
+    research_hours = (now - research_at).total_seconds() / 3600 if research_at else settings.reprediction_stale_hours
+
+    ai_probability = f.get("ai_probability")
+    edge = abs(ai_probability - current) if ai_probability is not None and current is not None else 0.0
+
+    base = (
+        _W_PRICE_MOVE * min(move / 0.10, 1.0)
+        + _W_PREDICTION_AGE * min(age_hours / settings.reprediction_stale_hours, 1.0)
+        + _W_RESEARCH_AGE * min(research_hours / settings.reprediction_stale_hours, 1.0)
+        + _W_EDGE * min(edge / 0.20, 1.0)
+    )
+
+    end_date = f.get("end_date")
+    if end_date:
+        days_left = (end_date - now).total_seconds() / 86400
+        if days_left <= 0:
+            return 0.0
+        urgency = 1.0 / (1.0 + days_left / 7)
+    else:
+        urgency = 0.25
+    volume_factor = min(math.log10(1 + (f.get("volume") or 0)) / 7, 1.0)
+
+    return round(base * (0.5 + urgency) * (0.5 + volume_factor), 4)
+
+
+def _features_from_row(row: dict) -> dict:
+    market = row.get("markets") or {}
+    return {
+        "prediction_odds": row.get("prediction_odds"),
+        "current_odds": row.get("current_odds"),
+        "ai_probability": row.get("ai_probability"),
+        "predicted_at": _parse_dt(row.get("predicted_at")),
+        "web_research_at": _parse_dt(market.get("web_research_at")),
+        "end_date": _parse_dt(market.get("end_date")),
+        "volume": market.get("volume") or 0,
+    }
+
+
+def _rescore(market_id: str):
+    f = _features.get(market_id)
+    if f is None:
+        return
+    _queue.update(market_id, score_market(f))
+
+
+def _bootstrap():
+    """One-time load of active, unresolved consensus rows into the queue."""
+    global _bootstrapped
+
+    result = (
+        supabase.table("consensus")
+        .select(
+            "market_id, prediction_odds, current_odds, ai_probability, predicted_at, "
+            "markets!inner(status, end_date, volume, web_research_at)"
+        )
+        .is_("resolved_at", "null")
+        .eq("markets.status", "active")
+        .execute()
+    )
+    for row in result.data or []:
+        _features[row["market_id"]] = _features_from_row(row)
+        _rescore(row["market_id"])
+    _bootstrapped = True
+    log.info("reprediction_queue_loaded", markets=len(_queue))
+
+
+def on_price_update(market_id: str, yes_price: float):
+    """Called by the odds updater; rescores just this market."""
+    f = _features.get(market_id)
+    if f is None:
+        return
+    f["current_odds"] = yes_price
+    _rescore(market_id)
+
+
+def on_predicted(market: dict, consensus: dict | None):
+    """Called after a market is (re-)predicted to reset its features."""
+    if consensus is None:
+        return
+    _features[market["id"]] = _features_from_row({**consensus, "markets": market})
+    _rescore(market["id"])
+
+
+def on_resolved(market_id: str):
+    _features.pop(market_id, None)
+    _queue.remove(market_id)
+
+
+async def run_repredictions() -> int:
+    """Re-predict the highest-value markets within this cycle's budget."""
+    global _last_rescore_all
+
+    from app.services import budget_governor
+    from app.workers.prediction_runner import run_predictions_for_market
+
+    try:
+        if not _bootstrapped:
+            _bootstrap()
+
+        now = datetime.now(timezone.utc)
+        if _last_rescore_all is None or (now - _last_rescore_all).total_seconds() > _RESCORE_ALL_SECONDS:
+            for market_id in list(_features):
+                _rescore(market_id)
+            _last_rescore_all = now
+
+        if budget_governor.remaining("reprediction") <= 0:
+            log.info("reprediction_skipped", reason="budget")
+            return 0
+
+        top = _queue.pop_top(settings.reprediction_per_cycle, settings.reprediction_min_score)
+        if not top:
+            return 0
+
+        scores = dict(top)
+        # Popped markets are off the queue; anything not handled below goes back on
+        pending = set(scores)
+        try:
+            markets = (
+                supabase.table("markets")
+                .select("*")
+                .in_("id", list(scores))
+                .eq("status", "active")
+                .execute()
+            )
+
+            # Markets that closed since they were queued drop out for good
+            for market_id in set(scores) - {m["id"] for m in markets.data or []}:
+                on_resolved(market_id)
+                pending.discard(market_id)
+
+            count = 0
+            for market in markets.data or []:
+                log.info("reprediction_started", market_id=market["id"], score=scores[market["id"]])
+                try:
+                    stored = await run_predictions_for_market(market, lane="reprediction")
+                except Exception as e:
+                    log.error("reprediction_market_error", market_id=market["id"], error=str(e))
+                    continue
+                pending.discard(market["id"])
+                if stored:
+                    count += 1
+                else:
+                    # Skipped by the cascade or budget: back off until it ages again
+                    f = _features.get(market["id"])
+                    if f is not None:
+                        f["predicted_at"] = now
+                        _rescore(market["id"])
+        finally:
+            for market_id in pending:
+                _rescore(market_id)
+
+        log.info("reprediction_cycle_done", candidates=len(top), repredicted=count, queued=len(_queue))
+        return count
+    except Exception as e:
+        log.error("reprediction_cycle_error", error=str(e))
+        return 0
@@ -1,40 +1,204 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
 from app.database import supabase
+from app.utils.bulk import bulk_update
+from app.utils.checkpoints import get_checkpoint, set_checkpoint
 from app.utils.logger import log
 
 
+def _parse_dt(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _next_check(candidate: dict, now: datetime) -> datetime:
+    """Exponential backoff for markets that are due but still unresolved upstream.
+
+    Markets without an end date wait the maximum interval; markets inside the
+    lookahead window are next checked just after their end date.
+    """
+    max_delay = timedelta(hours=settings.resolution_backoff_max_hours)
+    end_date = _parse_dt(candidate.get("end_date"))
+    if end_date is None:
+        return now + max_delay
+    if end_date > now:
+        # Not ended yet: check again shortly after it does
+        return min(end_date + timedelta(minutes=settings.resolution_backoff_base_minutes), now + max_delay)
+    attempts = candidate.get("resolution_attempts") or 0
+    delay = timedelta(minutes=settings.resolution_backoff_base_minutes * 2 ** min(attempts, 16))
+    return now + min(delay, max_delay)
+
+
+_FEED_CHECKPOINT = "gamma_closed_markets"
+# Where a sweep that hit the page cap left off: {"offset": ..., "newest": ...}
+_FEED_RESUME_CHECKPOINT = "gamma_closed_markets_resume"
+
+
+async def sync_closed_markets() -> int:
+    """Resolve from Gamma's closed-markets feed since the last checkpoint.
+
+    Pages of closed markets are hash-joined on polymarket_id against the
+    unresolved consensus set and every match is resolved in one batch.
+    A sweep that hits the page cap saves its offset and continues from there
+    on the next run; the checkpoint only advances once a sweep has read the
+    feed all the way down to it. Returns the number of markets resolved.
+    """
+    from app.services.performance_tracker import resolve_markets
+    from app.services.polymarket import fetch_closed_markets_since, parse_timestamp, resolution_outcome
+
+    since = parse_timestamp(get_checkpoint(_FEED_CHECKPOINT))
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.resolution_feed_initial_lookback_days)
+
+    # Newer updates only push the unread tail to higher offsets, so resuming
+    # at the saved offset can re-read markets but never skips one
+    try:
+        resume = json.loads(get_checkpoint(_FEED_RESUME_CHECKPOINT) or "{}")
+    except ValueError:
+        resume = {}
+    offset = int(resume.get("offset") or 0)
+    newest = max(since, parse_timestamp(resume.get("newest")) or since)
+
+    unresolved = (
+        supabase.table("consensus")
+        .select("id, market_id, final_decision, bet_amount, bet_odds, markets!inner(polymarket_id)")
+        .is_("resolved_at", "null")
+        .execute()
+    )
+    by_polymarket_id = {
+        (row.get("markets") or {}).get("polymarket_id"): row for row in unresolved.data or []
+    }
+    by_polymarket_id.pop(None, None)
+
+    matches: list[tuple[dict, str]] = []
+    pages = 0
+    last_page_full = False
+    async for page in fetch_closed_markets_since(
+        since,
+        page_size=settings.resolution_feed_page_size,
+        max_pages=settings.resolution_feed_max_pages,
+        offset=offset,
+    ):
+        pages += 1
+        last_page_full = len(page) >= settings.resolution_feed_page_size
+        for market in page:
+            updated_at = parse_timestamp(market.get("updatedAt"))
+            if updated_at is not None:
+                newest = max(newest, updated_at)
+            entry = by_polymarket_id.pop(str(market.get("id")), None)
+            if entry is None:
+                continue
+            outcome = resolution_outcome(market)
+            if outcome:
+                matches.append((entry, outcome))
+            else:
+                # Closed but not settled yet: a later update will carry it past the checkpoint again
+                by_polymarket_id[str(market.get("id"))] = entry
+        if not by_polymarket_id:
+            break
+
+    # Hitting the page cap leaves updates between since and the last page
+    # unread: remember how far this sweep got and pick up there next run
+    capped = pages >= settings.resolution_feed_max_pages and last_page_full and bool(by_polymarket_id)
+    resolved = await resolve_markets(matches, update_markets=True)
+    checkpoint = since
+    if resolved == len(matches):
+        if capped:
+            offset += pages * settings.resolution_feed_page_size
+            set_checkpoint(_FEED_RESUME_CHECKPOINT, json.dumps({"offset": offset, "newest": newest.isoformat()}))
+        else:
+            if newest > since:
+                checkpoint = newest
+                set_checkpoint(_FEED_CHECKPOINT, checkpoint.isoformat())
+            if resume:
+                set_checkpoint(_FEED_RESUME_CHECKPOINT, "")
+    log.info(
+        "closed_markets_synced",
+        pages=pages,
+        offset=offset,
+        matched=len(matches),
+        resolved=resolved,
+        capped=capped,
+        checkpoint=checkpoint.isoformat(),
+    )
+    return resolved
+
+
 async def check_resolutions():
-    """Check for resolved markets and compute P&L."""
+    """Check markets at or near their end date for resolution and compute P&L."""
     log.info("resolution_checker_started")
     try:
-        from app.services.performance_tracker import resolve_market
-
-        # Get active consensus entries where the market might be resolved
-        active = (
-            supabase.table("consensus")
-            .select("*, markets!inner(id, polymarket_id, status, outcome)")
-            .is_("resolved_at", "null")
-            .execute()
+        from app.services.performance_tracker import resolve_markets
+        from app.services.polymarket import check_market_resolution
+
+        if settings.resolution_feed_enabled:
+            try:
+                await sync_closed_markets()
+            except Exception as e:
+                log.error("closed_markets_sync_error", error=str(e))
+
+        now = datetime.now(timezone.utc)
+        horizon = now + timedelta(hours=settings.resolution_lookahead_hours)
+        candidates = (
+            supabase.rpc(
+                "resolution_candidates",
+                {"p_horizon": horizon.isoformat(), "p_limit": settings.resolution_max_checks_per_cycle},
+            ).execute().data
+            or []
         )
+        if not candidates:
+            log.info("resolution_checker_done", candidates=0, upstream_checks=0, resolved=0)
+            return
 
-        resolved_count = 0
-        for entry in active.data or []:
-            market = entry.get("markets", {})
-            if market.get("status") == "resolved" and market.get("outcome"):
-                await resolve_market(entry, market["outcome"])
-                resolved_count += 1
+        semaphore = asyncio.Semaphore(settings.resolution_check_concurrency)
+
+        async def check(candidate: dict) -> str | None:
+            # Already resolved locally: no upstream call needed
+            if candidate.get("market_status") == "resolved" and candidate.get("market_outcome"):
+                return candidate["market_outcome"]
+            if not candidate.get("polymarket_id"):
+                return None
+            async with semaphore:
+                try:
+                    return await check_market_resolution(candidate["polymarket_id"])
+                except Exception as e:
+                    log.error("resolution_check_single_error", market_id=candidate["market_id"], error=str(e))
+                    return None
+
+        outcomes = await asyncio.gather(*(check(c) for c in candidates))
+
+        resolutions = []
+        backoff_rows = []
+        for candidate, outcome in zip(candidates, outcomes):
+            if outcome:
+                resolutions.append((candidate, outcome))
             else:
-                # Check Polymarket if it's resolved upstream
-                from app.services.polymarket import check_market_resolution
-                resolution = await check_market_resolution(market.get("polymarket_id"))
-                if resolution:
-                    # Update market status
-                    supabase.table("markets").update({
-                        "status": "resolved",
-                        "outcome": resolution,
-                    }).eq("id", market["id"]).execute()
-                    await resolve_market(entry, resolution)
-                    resolved_count += 1
-
-        log.info("resolution_checker_done", resolved=resolved_count)
+                backoff_rows.append({
+                    "market_id": candidate["market_id"],
+                    "resolution_attempts": (candidate.get("resolution_attempts") or 0) + 1,
+                    "resolution_next_check_at": _next_check(candidate, now).isoformat(),
+                })
+
+        resolved_count = await resolve_markets(resolutions, update_markets=True)
+
+        if backoff_rows:
+            bulk_update("consensus", backoff_rows, key="market_id")
+
+        log.info(
+            "resolution_checker_done",
+            candidates=len(candidates),
+            upstream_checks=sum(
+                1 for c in candidates if not (c.get("market_status") == "resolved" and c.get("market_outcome"))
+            ),
+            resolved=resolved_count,
+            backed_off=len(backoff_rows),
+        )
     except Exception as e:
         log.error("resolution_checker_error", error=str(e))
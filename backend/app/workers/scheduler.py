@@ -11,6 +11,10 @@ def start_scheduler():
     from app.workers.odds_updater import update_odds
     from app.workers.resolution_checker import check_resolutions
     from app.workers.trader_scanner import scan_top_traders
+    from app.workers.reprediction_scheduler import run_repredictions
+    from app.services.telemetry import flush_telemetry
+    from app.services.odds_history import prune_odds_history
+    from app.services.trader_tracker import reconcile_trader_counters
 
     scheduler.add_job(
         poll_markets,
@@ -44,6 +48,38 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    scheduler.add_job(
+        run_repredictions,
+        IntervalTrigger(minutes=settings.reprediction_interval_minutes),
+        id="reprediction_scheduler",
+        name="Re-predict stale or moved markets",
+        replace_existing=True,
+    )
+
+    scheduler.add_job(
+        flush_telemetry,
+        IntervalTrigger(seconds=settings.telemetry_flush_interval_seconds),
+        id="telemetry_flush",
+        name="Flush LLM call telemetry",
+        replace_existing=True,
+    )
+
+    scheduler.add_job(
+        prune_odds_history,
+        IntervalTrigger(hours=settings.odds_history_prune_interval_hours),
+        id="odds_history_prune",
+        name="Prune aged odds history",
+        replace_existing=True,
+    )
+
+    scheduler.add_job(
+        reconcile_trader_counters,
+        IntervalTrigger(hours=settings.trader_counter_reconcile_interval_hours),
+        id="trader_counter_reconcile",
+        name="Reconcile trader trade counters",
+        replace_existing=True,
+    )
+
     scheduler.start()
     log.info("scheduler_started", jobs=len(scheduler.get_jobs()))
 
@@ -1,68 +1,141 @@
+import asyncio
+
+from app.config import settings
 from app.database import supabase
+from app.utils.bulk import bulk_update
 from app.utils.logger import log
 
+# Leaderboard stats mirrored onto tracked_traders. pnl/volume belong to the
+# profile refresh (positions-derived), so the scanner keeps its own columns
+# and only writes a row when one of these changed.
+_STAT_FIELDS = ("rank", "leaderboard_pnl", "leaderboard_volume", "leaderboard_period")
+
+_IN_CHUNK = 200
+
+
+async def _fetch_boards() -> tuple[dict[str, tuple[str, str, dict]], bool]:
+    """Fetch every configured leaderboard concurrently.
+
+    Returns ({wallet: (category, period, entry)}, primary_ok). Each wallet
+    keeps its entry from the first board in settings order (periods before
+    categories, so the first period wins wherever the wallet appears on it).
+    primary_ok is False if any first-period board failed, in which case a
+    wallet's winning board could differ from a normal scan.
+    """
+    from app.services.trader_tracker import fetch_leaderboard
+
+    boards = [
+        (category, period)
+        for period in settings.trader_scan_periods
+        for category in settings.trader_scan_categories
+    ]
+    results = await asyncio.gather(
+        *(
+            fetch_leaderboard(category=category, time_period=period, limit=settings.trader_scan_limit)
+            for category, period in boards
+        ),
+        return_exceptions=True,
+    )
+
+    primary_period = settings.trader_scan_periods[0] if settings.trader_scan_periods else None
+    primary_ok = True
+    by_wallet: dict[str, tuple[str, str, dict]] = {}
+    for (category, period), entries in zip(boards, results):
+        if isinstance(entries, Exception):
+            log.warning("leaderboard_fetch_error", category=category, period=period, error=str(entries))
+            primary_ok = primary_ok and period != primary_period
+            continue
+        for entry in entries:
+            wallet = entry.get("proxyWallet")
+            if wallet and wallet not in by_wallet:
+                by_wallet[wallet] = (category, period, entry)
+    return by_wallet, primary_ok
+
+
+def _load_existing(wallets: list[str]) -> dict[str, dict]:
+    existing: dict[str, dict] = {}
+    for start in range(0, len(wallets), _IN_CHUNK):
+        result = (
+            supabase.table("tracked_traders")
+            .select("proxy_wallet, " + ", ".join(_STAT_FIELDS))
+            .in_("proxy_wallet", wallets[start:start + _IN_CHUNK])
+            .execute()
+        )
+        existing.update({row["proxy_wallet"]: row for row in result.data or []})
+    return existing
+
+
+def _stats(period: str, entry: dict) -> dict:
+    return {
+        "rank": int(entry["rank"]) if entry.get("rank") is not None else None,
+        "leaderboard_pnl": round(float(entry.get("pnl", 0) or 0), 2),
+        "leaderboard_volume": round(float(entry.get("vol", 0) or 0), 2),
+        "leaderboard_period": period,
+    }
+
+
+def _changed(old: dict, new: dict) -> bool:
+    for field in _STAT_FIELDS:
+        a, b = old.get(field), new.get(field)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            if abs(a - b) > 0.005:
+                return True
+        elif a != b:
+            return True
+    return False
+
 
 async def scan_top_traders() -> int:
     """Auto-discover top traders and refresh all tracked traders."""
-    from app.services.trader_tracker import (
-        fetch_leaderboard,
-        refresh_all_tracked_traders,
-    )
+    from app.services.trader_tracker import refresh_all_tracked_traders
 
     log.info("trader_scanner_started")
     try:
-        # 1. Fetch top 10 from leaderboard
-        entries = await fetch_leaderboard(limit=10)
-        new_tracked = 0
+        # 1. Reconcile the leaderboards against the watchlist: one read, then
+        #    one upsert for new traders and one bulk update for changed stats
+        by_wallet, primary_ok = await _fetch_boards()
+        existing = _load_existing(list(by_wallet))
 
-        for entry in entries:
-            wallet = entry.get("proxyWallet")
-            if not wallet:
-                continue
-
-            # Check if already tracked
-            existing = (
-                supabase.table("tracked_traders")
-                .select("id")
-                .eq("proxy_wallet", wallet)
-                .execute()
-            )
-            if existing.data:
-                # Update leaderboard stats
-                supabase.table("tracked_traders").update({
-                    "pnl": float(entry.get("pnl", 0) or 0),
-                    "volume": float(entry.get("vol", 0) or 0),
-                    "rank": entry.get("rank"),
-                    "username": entry.get("userName") or existing.data[0].get("username"),
-                }).eq("id", existing.data[0]["id"]).execute()
-                continue
-
-            # Auto-track new top trader
-            row = {
-                "proxy_wallet": wallet,
-                "username": entry.get("userName"),
-                "profile_image": entry.get("profileImage"),
-                "x_username": entry.get("xUsername"),
-                "verified_badge": entry.get("verifiedBadge", False),
-                "pnl": float(entry.get("pnl", 0) or 0),
-                "volume": float(entry.get("vol", 0) or 0),
-                "rank": entry.get("rank"),
-                "auto_discovered": True,
-            }
+        inserts, updates = [], []
+        for wallet, (category, period, entry) in by_wallet.items():
+            stats = _stats(period, entry)
+            current = existing.get(wallet)
+            if current is None:
+                inserts.append({
+                    "proxy_wallet": wallet,
+                    "username": entry.get("userName"),
+                    "profile_image": entry.get("profileImage"),
+                    "x_username": entry.get("xUsername"),
+                    "verified_badge": entry.get("verifiedBadge", False),
+                    # Seed values until the first profile refresh
+                    "pnl": stats["leaderboard_pnl"],
+                    "volume": stats["leaderboard_volume"],
+                    "auto_discovered": True,
+                    "category": category,
+                    **stats,
+                })
+            elif primary_ok and _changed(current, stats):
+                updates.append({"proxy_wallet": wallet, **stats})
+
+        new_tracked = 0
+        if inserts:
             try:
-                supabase.table("tracked_traders").upsert(
-                    row, on_conflict="proxy_wallet"
-                ).execute()
-                new_tracked += 1
+                supabase.table("tracked_traders").upsert(inserts, on_conflict="proxy_wallet").execute()
+                new_tracked = len(inserts)
             except Exception as e:
-                log.warning("auto_track_skip", wallet=wallet, error=str(e))
+                log.warning("auto_track_skip", rows=len(inserts), error=str(e))
+        updated = len(updates) - len(bulk_update("tracked_traders", updates, key="proxy_wallet"))
 
         # 2. Refresh all tracked traders' profiles and trades
         refreshed = await refresh_all_tracked_traders()
 
         log.info(
             "trader_scanner_done",
+            leaderboard_wallets=len(by_wallet),
             new_tracked=new_tracked,
+            updated=updated,
+            unchanged=len(by_wallet) - len(inserts) - len(updates),
+            stats_skipped=not primary_ok,
             refreshed=refreshed,
         )
         return new_tracked
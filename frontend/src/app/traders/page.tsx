@@ -66,7 +66,12 @@ export default function TradersPage() {
   async function handleRefreshAll() {
     setRefreshingAll(true);
     try {
-      await api.traders.refreshAll();
+      // Refresh runs server-side as a background job; poll its handle
+      let job = await api.traders.refreshAll();
+      while (job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = await api.traders.refreshAllStatus(job.id);
+      }
       refreshTracked();
       api.traders.stats().then(setStats).catch(() => {});
     } catch {
@@ -15,6 +15,7 @@ import type {
   TraderActivity,
   TraderPosition,
   TraderStats,
+  TraderRefreshJob,
 } from "./types";
 
 const API_BASE = "/api";
@@ -132,7 +133,8 @@ export const api = {
       return fetchJson<TraderTrade[]>(`/traders/${traderId}/trades${qs ? `?${qs}` : ""}`);
     },
     refresh: (traderId: string) => postJson<{ status: string; trades_refreshed: number }>(`/traders/${traderId}/refresh`),
-    refreshAll: () => postJson<{ status: string; refreshed: number }>("/traders/refresh-all"),
+    refreshAll: () => postJson<TraderRefreshJob>("/traders/refresh-all"),
+    refreshAllStatus: (jobId: string) => fetchJson<TraderRefreshJob>(`/traders/refresh-all/${jobId}`),
     stats: () => fetchJson<TraderStats>("/traders/stats/summary"),
   },
 };
@@ -88,6 +88,8 @@ export interface PnlPoint {
   date: string;
   cumulative_pnl: number;
   daily_pnl: number;
+  period_pnl: number;
+  resolved: number;
 }
 
 export interface LeaderboardEntry {
@@ -112,9 +114,15 @@ export interface TrackedTrader {
   pnl: number;
   volume: number;
   rank: number | null;
+  leaderboard_pnl: number | null;
+  leaderboard_volume: number | null;
+  leaderboard_period: string | null;
   category: string;
   auto_discovered: boolean;
   last_refreshed_at: string | null;
+  trade_count: number;
+  active_markets: number;
+  trade_volume: number;
   created_at: string;
   updated_at: string;
 }
@@ -168,8 +176,6 @@ export interface TraderPosition {
 
 export interface TraderDetail extends TrackedTrader {
   trades: TraderTrade[];
-  trade_count: number;
-  active_markets: number;
 }
 
 export interface TraderStats {
@@ -179,6 +185,15 @@ export interface TraderStats {
   top_trader: string | null;
 }
 
+export interface TraderRefreshJob {
+  id: string;
+  status: "running" | "done" | "failed";
+  total: number;
+  completed: number;
+  failed: number;
+  elapsed_ms: number;
+}
+
 export interface ExploreMarket {
   id: string;
   question: string;
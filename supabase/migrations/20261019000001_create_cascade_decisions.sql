@@ -0,0 +1,13 @@
+-- Prediction cascade skip log: which stage stopped a market and what it saved
+CREATE TABLE cascade_decisions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL CHECK (stage IN ('heuristic', 'screen')),
+    reason TEXT NOT NULL,
+    screen_edge DOUBLE PRECISION,
+    est_cost_saved DOUBLE PRECISION DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX idx_cascade_decisions_market_id ON cascade_decisions(market_id);
+CREATE INDEX idx_cascade_decisions_created_at ON cascade_decisions(created_at DESC);
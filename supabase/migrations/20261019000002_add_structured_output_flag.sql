@@ -0,0 +1,5 @@
+-- Models that accept a JSON schema via response_format
+ALTER TABLE llm_models ADD COLUMN IF NOT EXISTS supports_structured_output BOOLEAN DEFAULT false;
+
+UPDATE llm_models SET supports_structured_output = true
+WHERE openrouter_id IN ('openai/gpt-4o', 'google/gemini-2.0-flash-001');
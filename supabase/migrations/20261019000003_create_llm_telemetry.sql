@@ -0,0 +1,80 @@
+-- Append-only per-call LLM telemetry
+CREATE TABLE llm_call_telemetry (
+    id BIGSERIAL PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cached_tokens INTEGER,
+    cost DOUBLE PRECISION,
+    attempts SMALLINT DEFAULT 1,
+    latency_ms INTEGER NOT NULL,
+    queue_ms INTEGER DEFAULT 0,
+    ok BOOLEAN DEFAULT true,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX idx_llm_call_telemetry_created_at ON llm_call_telemetry(created_at DESC);
+
+-- Hourly pre-aggregated buckets; latency_hist holds counts per latency bin
+-- (bin edges match LATENCY_BOUNDS_MS in app/services/telemetry.py)
+CREATE TABLE llm_telemetry_hourly (
+    model_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    calls INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    attempts INTEGER DEFAULT 0,
+    prompt_tokens BIGINT DEFAULT 0,
+    completion_tokens BIGINT DEFAULT 0,
+    cached_tokens BIGINT DEFAULT 0,
+    cost DOUBLE PRECISION DEFAULT 0,
+    latency_ms_sum BIGINT DEFAULT 0,
+    latency_ms_max INTEGER DEFAULT 0,
+    queue_ms_sum BIGINT DEFAULT 0,
+    latency_hist INTEGER[] NOT NULL DEFAULT array_fill(0, ARRAY[20]),
+    PRIMARY KEY (model_name, kind, bucket_start)
+);
+
+CREATE INDEX idx_llm_telemetry_hourly_bucket ON llm_telemetry_hourly(bucket_start DESC);
+
+CREATE OR REPLACE FUNCTION rollup_llm_telemetry()
+RETURNS TRIGGER AS $$
+DECLARE
+    bin INTEGER := width_bucket(
+        NEW.latency_ms,
+        ARRAY[100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+              7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000, 120000]
+    ) + 1;
+BEGIN
+    INSERT INTO llm_telemetry_hourly AS h (
+        model_name, kind, bucket_start, calls, errors, attempts,
+        prompt_tokens, completion_tokens, cached_tokens, cost,
+        latency_ms_sum, latency_ms_max, queue_ms_sum, latency_hist
+    ) VALUES (
+        NEW.model_name, NEW.kind, date_trunc('hour', NEW.created_at), 1,
+        CASE WHEN NEW.ok THEN 0 ELSE 1 END, COALESCE(NEW.attempts, 1),
+        COALESCE(NEW.prompt_tokens, 0), COALESCE(NEW.completion_tokens, 0),
+        COALESCE(NEW.cached_tokens, 0), COALESCE(NEW.cost, 0),
+        NEW.latency_ms, NEW.latency_ms, COALESCE(NEW.queue_ms, 0),
+        (SELECT array_agg(CASE WHEN i = bin THEN 1 ELSE 0 END ORDER BY i) FROM generate_series(1, 20) AS i)
+    )
+    ON CONFLICT (model_name, kind, bucket_start) DO UPDATE SET
+        calls = h.calls + 1,
+        errors = h.errors + EXCLUDED.errors,
+        attempts = h.attempts + EXCLUDED.attempts,
+        prompt_tokens = h.prompt_tokens + EXCLUDED.prompt_tokens,
+        completion_tokens = h.completion_tokens + EXCLUDED.completion_tokens,
+        cached_tokens = h.cached_tokens + EXCLUDED.cached_tokens,
+        cost = h.cost + EXCLUDED.cost,
+        latency_ms_sum = h.latency_ms_sum + EXCLUDED.latency_ms_sum,
+        latency_ms_max = GREATEST(h.latency_ms_max, EXCLUDED.latency_ms_max),
+        queue_ms_sum = h.queue_ms_sum + EXCLUDED.queue_ms_sum,
+        latency_hist[bin] = h.latency_hist[bin] + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER llm_call_telemetry_rollup
+    AFTER INSERT ON llm_call_telemetry
+    FOR EACH ROW EXECUTE FUNCTION rollup_llm_telemetry();
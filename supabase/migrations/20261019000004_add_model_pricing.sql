@@ -0,0 +1,7 @@
+-- Per-million-token prices used by the budget governor for cost estimates
+ALTER TABLE llm_models ADD COLUMN IF NOT EXISTS input_cost_per_mtok DOUBLE PRECISION;
+ALTER TABLE llm_models ADD COLUMN IF NOT EXISTS output_cost_per_mtok DOUBLE PRECISION;
+
+UPDATE llm_models SET input_cost_per_mtok = 2.5, output_cost_per_mtok = 10 WHERE openrouter_id = 'openai/gpt-4o';
+UPDATE llm_models SET input_cost_per_mtok = 3, output_cost_per_mtok = 15 WHERE openrouter_id = 'anthropic/claude-sonnet-4';
+UPDATE llm_models SET input_cost_per_mtok = 0.1, output_cost_per_mtok = 0.4 WHERE openrouter_id = 'google/gemini-2.0-flash-001';
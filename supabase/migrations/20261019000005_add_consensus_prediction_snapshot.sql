@@ -0,0 +1,7 @@
+-- Snapshot of the market at prediction time, used to score re-predictions
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS prediction_odds DOUBLE PRECISION;
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS ai_probability DOUBLE PRECISION;
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS predicted_at TIMESTAMPTZ DEFAULT now();
+
+UPDATE consensus SET prediction_odds = current_odds WHERE prediction_odds IS NULL;
+UPDATE consensus SET predicted_at = created_at WHERE predicted_at IS NULL;
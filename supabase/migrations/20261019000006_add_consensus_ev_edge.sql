@@ -0,0 +1,5 @@
+-- Mark-to-market EV and edge, refreshed by the bulk consensus recompute
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS ev DOUBLE PRECISION;
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS edge DOUBLE PRECISION;
+
+CREATE INDEX IF NOT EXISTS idx_consensus_edge ON consensus(edge DESC) WHERE resolved_at IS NULL;
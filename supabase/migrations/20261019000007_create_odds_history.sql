@@ -0,0 +1,71 @@
+-- Raw YES-price ticks, written by the odds updater only when the price moved
+CREATE TABLE odds_history (
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    ts TIMESTAMPTZ NOT NULL,
+    yes_price DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (market_id, ts)
+);
+
+-- OHLC buckets at 1-minute, 1-hour and 1-day resolution, maintained by trigger
+CREATE TABLE odds_history_buckets (
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    resolution TEXT NOT NULL CHECK (resolution IN ('1m', '1h', '1d')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+    open DOUBLE PRECISION NOT NULL,
+    high DOUBLE PRECISION NOT NULL,
+    low DOUBLE PRECISION NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    close_ts TIMESTAMPTZ NOT NULL,
+    samples INTEGER DEFAULT 1,
+    PRIMARY KEY (market_id, resolution, bucket_start)
+);
+
+CREATE INDEX idx_odds_history_buckets_retention ON odds_history_buckets(resolution, bucket_start);
+
+CREATE OR REPLACE FUNCTION rollup_odds_history()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO odds_history_buckets AS b (
+        market_id, resolution, bucket_start, open, high, low, close, close_ts
+    )
+    SELECT NEW.market_id, r.resolution, date_trunc(r.unit, NEW.ts),
+           NEW.yes_price, NEW.yes_price, NEW.yes_price, NEW.yes_price, NEW.ts
+    FROM (VALUES ('1m', 'minute'), ('1h', 'hour'), ('1d', 'day')) AS r(resolution, unit)
+    ON CONFLICT (market_id, resolution, bucket_start) DO UPDATE SET
+        high = GREATEST(b.high, EXCLUDED.high),
+        low = LEAST(b.low, EXCLUDED.low),
+        close = CASE WHEN EXCLUDED.close_ts >= b.close_ts THEN EXCLUDED.close ELSE b.close END,
+        close_ts = GREATEST(b.close_ts, EXCLUDED.close_ts),
+        samples = b.samples + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER odds_history_rollup
+    AFTER INSERT ON odds_history
+    FOR EACH ROW EXECUTE FUNCTION rollup_odds_history();
+
+-- Retention: raw ticks and finer buckets age out, daily buckets are kept
+CREATE OR REPLACE FUNCTION prune_odds_history(raw_days INTEGER, minute_days INTEGER, hour_days INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    deleted INTEGER := 0;
+    n INTEGER;
+BEGIN
+    DELETE FROM odds_history WHERE ts < now() - make_interval(days => raw_days);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    deleted := deleted + n;
+
+    DELETE FROM odds_history_buckets
+    WHERE resolution = '1m' AND bucket_start < now() - make_interval(days => minute_days);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    deleted := deleted + n;
+
+    DELETE FROM odds_history_buckets
+    WHERE resolution = '1h' AND bucket_start < now() - make_interval(days => hour_days);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    deleted := deleted + n;
+
+    RETURN deleted;
+END;
+$$ LANGUAGE plpgsql;
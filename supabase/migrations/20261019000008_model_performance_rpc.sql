@@ -0,0 +1,51 @@
+-- Per-model, per-category scoring against the resolved market outcome in one pass
+CREATE OR REPLACE FUNCTION model_performance()
+RETURNS TABLE (
+    model_name TEXT,
+    category TEXT,
+    total_predictions BIGINT,
+    no_trade BIGINT,
+    correct BIGINT,
+    incorrect BIGINT,
+    confidence_sum DOUBLE PRECISION,
+    confidence_count BIGINT,
+    scored BIGINT,
+    brier_sum DOUBLE PRECISION,
+    log_loss_sum DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    WITH scored_predictions AS (
+        SELECT
+            p.model_name,
+            COALESCE(NULLIF(m.category, ''), 'uncategorized') AS category,
+            p.prediction,
+            p.confidence,
+            p.error IS NULL AS ok,
+            CASE
+                WHEN upper(trim(m.outcome)) IN ('YES', 'Y') THEN 'YES'
+                WHEN upper(trim(m.outcome)) IN ('NO', 'N') THEN 'NO'
+            END AS outcome,
+            -- Clamped so log loss stays finite for 0/1 confidences
+            LEAST(GREATEST(
+                CASE p.prediction WHEN 'YES' THEN p.confidence WHEN 'NO' THEN 1 - p.confidence END,
+                1e-6), 1 - 1e-6) AS p_yes
+        FROM predictions p
+        JOIN markets m ON m.id = p.market_id
+    )
+    SELECT
+        model_name,
+        category,
+        count(*),
+        count(*) FILTER (WHERE prediction = 'NO_TRADE'),
+        count(*) FILTER (WHERE ok AND outcome IS NOT NULL AND prediction = outcome),
+        count(*) FILTER (WHERE ok AND outcome IS NOT NULL AND prediction IN ('YES', 'NO') AND prediction <> outcome),
+        COALESCE(sum(confidence) FILTER (WHERE confidence > 0), 0),
+        count(*) FILTER (WHERE confidence > 0),
+        count(*) FILTER (WHERE ok AND outcome IS NOT NULL AND p_yes IS NOT NULL),
+        COALESCE(sum(power(p_yes - (outcome = 'YES')::int, 2))
+            FILTER (WHERE ok AND outcome IS NOT NULL AND p_yes IS NOT NULL), 0),
+        COALESCE(sum(CASE WHEN outcome = 'YES' THEN -ln(p_yes) ELSE -ln(1 - p_yes) END)
+            FILTER (WHERE ok AND outcome IS NOT NULL AND p_yes IS NOT NULL), 0)
+    FROM scored_predictions
+    GROUP BY model_name, category;
+$$;
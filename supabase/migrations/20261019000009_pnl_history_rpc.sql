@@ -0,0 +1,37 @@
+-- Realised P&L per day/week/month bucket, with the running total carried in
+-- from before the requested range
+CREATE OR REPLACE FUNCTION pnl_history(
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL,
+    p_granularity TEXT DEFAULT 'day'
+)
+RETURNS TABLE (
+    bucket TIMESTAMPTZ,
+    pnl DOUBLE PRECISION,
+    resolved BIGINT,
+    cumulative_pnl DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    WITH opening AS (
+        SELECT COALESCE(sum(c.pnl), 0) AS total
+        FROM consensus c
+        WHERE c.resolved_at < COALESCE(p_from, '-infinity'::timestamptz)
+    ),
+    buckets AS (
+        SELECT date_trunc(p_granularity, c.resolved_at) AS bucket,
+               COALESCE(sum(c.pnl), 0) AS pnl,
+               count(*) AS resolved
+        FROM consensus c
+        WHERE c.resolved_at IS NOT NULL
+          AND c.resolved_at >= COALESCE(p_from, '-infinity'::timestamptz)
+          AND c.resolved_at < COALESCE(p_to, 'infinity'::timestamptz)
+        GROUP BY 1
+    )
+    SELECT b.bucket, b.pnl, b.resolved,
+           o.total + sum(b.pnl) OVER (ORDER BY b.bucket)
+    FROM buckets b CROSS JOIN opening o
+    ORDER BY b.bucket;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_consensus_resolved_at_pnl ON consensus(resolved_at) INCLUDE (pnl)
+    WHERE resolved_at IS NOT NULL;
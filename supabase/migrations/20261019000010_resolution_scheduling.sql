@@ -0,0 +1,35 @@
+-- Backoff state for markets that stay unresolved past their end date
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS resolution_attempts INTEGER DEFAULT 0;
+ALTER TABLE consensus ADD COLUMN IF NOT EXISTS resolution_next_check_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_markets_end_date ON markets(end_date);
+CREATE INDEX IF NOT EXISTS idx_consensus_unresolved_next_check
+    ON consensus(resolution_next_check_at) WHERE resolved_at IS NULL;
+
+-- Unresolved consensus rows due for a resolution check: markets already
+-- resolved locally first, then by end date, soonest first. Markets ending
+-- after p_horizon are not due yet.
+CREATE OR REPLACE FUNCTION resolution_candidates(p_horizon TIMESTAMPTZ, p_limit INTEGER)
+RETURNS TABLE (
+    id UUID,
+    market_id UUID,
+    final_decision TEXT,
+    bet_amount DOUBLE PRECISION,
+    bet_odds DOUBLE PRECISION,
+    resolution_attempts INTEGER,
+    polymarket_id TEXT,
+    end_date TIMESTAMPTZ,
+    market_status TEXT,
+    market_outcome TEXT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT c.id, c.market_id, c.final_decision, c.bet_amount, c.bet_odds,
+           COALESCE(c.resolution_attempts, 0), m.polymarket_id, m.end_date, m.status, m.outcome
+    FROM consensus c
+    JOIN markets m ON m.id = c.market_id
+    WHERE c.resolved_at IS NULL
+      AND (m.end_date IS NULL OR m.end_date <= p_horizon OR m.status = 'resolved')
+      AND (c.resolution_next_check_at IS NULL OR c.resolution_next_check_at <= now())
+    ORDER BY (m.status = 'resolved' AND m.outcome IS NOT NULL) DESC, m.end_date ASC NULLS LAST
+    LIMIT p_limit;
+$$;
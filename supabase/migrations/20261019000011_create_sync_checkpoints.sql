@@ -0,0 +1,10 @@
+-- Named high-water marks for incremental syncs against upstream feeds
+CREATE TABLE sync_checkpoints (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE TRIGGER sync_checkpoints_updated_at
+    BEFORE UPDATE ON sync_checkpoints
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at();
@@ -0,0 +1,48 @@
+-- Apply many row-specific partial updates in one request.
+--
+-- p_rows is a JSON array of objects; each holds the key column plus the
+-- columns to set on that row. Values are cast via the table's row type.
+-- Each row runs in its own exception block, so one bad row does not abort
+-- the rest; failed rows (including keys that match nothing) are returned.
+CREATE OR REPLACE FUNCTION bulk_update(p_table TEXT, p_key TEXT, p_rows JSONB)
+RETURNS TABLE (row_key TEXT, error TEXT)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_row JSONB;
+    v_set TEXT;
+    v_count INTEGER;
+BEGIN
+    IF p_table NOT IN ('markets', 'consensus', 'tracked_traders', 'trader_trades') THEN
+        RAISE EXCEPTION 'bulk_update not allowed on table %', p_table;
+    END IF;
+
+    FOR v_row IN SELECT * FROM jsonb_array_elements(p_rows) LOOP
+        BEGIN
+            SELECT string_agg(format('%I = r.%I', k, k), ', ')
+            INTO v_set
+            FROM jsonb_object_keys(v_row) AS k
+            WHERE k <> p_key;
+
+            IF v_set IS NULL THEN
+                CONTINUE;
+            END IF;
+
+            EXECUTE format(
+                'UPDATE %I AS t SET %s FROM jsonb_populate_record(NULL::%I, $1) AS r WHERE t.%I = r.%I',
+                p_table, v_set, p_table, p_key, p_key
+            ) USING v_row;
+            GET DIAGNOSTICS v_count = ROW_COUNT;
+
+            IF v_count = 0 THEN
+                row_key := v_row ->> p_key;
+                error := 'no matching row';
+                RETURN NEXT;
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            row_key := v_row ->> p_key;
+            error := SQLERRM;
+            RETURN NEXT;
+        END;
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,16 @@
+-- Per-trader high-water mark for incremental trade ingestion
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS last_trade_at TIMESTAMPTZ;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS last_trade_hash TEXT;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS backfilled_at TIMESTAMPTZ;
+
+UPDATE tracked_traders t
+SET last_trade_at = latest.traded_at,
+    last_trade_hash = latest.transaction_hash
+FROM (
+    SELECT DISTINCT ON (trader_id) trader_id, traded_at, transaction_hash
+    FROM trader_trades
+    ORDER BY trader_id, traded_at DESC
+) AS latest
+WHERE latest.trader_id = t.id AND t.last_trade_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_trader_trades_trader_traded_at ON trader_trades(trader_id, traded_at DESC);
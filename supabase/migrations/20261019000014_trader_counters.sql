@@ -0,0 +1,149 @@
+-- Denormalized per-trader counters, maintained by statement-level triggers on trader_trades
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS trade_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS active_markets INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS trade_volume DOUBLE PRECISION NOT NULL DEFAULT 0;
+
+-- Trades per (trader, market), so active_markets can be kept as a distinct count
+CREATE TABLE IF NOT EXISTS trader_markets (
+    trader_id UUID NOT NULL REFERENCES tracked_traders(id) ON DELETE CASCADE,
+    market_slug TEXT NOT NULL,
+    trades INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (trader_id, market_slug)
+);
+
+CREATE OR REPLACE FUNCTION trader_trades_counters_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH markets AS (
+        INSERT INTO trader_markets AS m (trader_id, market_slug, trades)
+        SELECT trader_id, market_slug, count(*)
+        FROM new_rows
+        WHERE market_slug IS NOT NULL
+        GROUP BY trader_id, market_slug
+        ON CONFLICT (trader_id, market_slug) DO UPDATE SET trades = m.trades + EXCLUDED.trades
+        RETURNING m.trader_id, (m.xmax = 0) AS inserted
+    ),
+    new_markets AS (
+        SELECT trader_id, count(*) FILTER (WHERE inserted) AS n FROM markets GROUP BY trader_id
+    ),
+    added AS (
+        SELECT trader_id, count(*) AS n, COALESCE(sum(size * price), 0) AS volume
+        FROM new_rows
+        GROUP BY trader_id
+    )
+    UPDATE tracked_traders t
+    SET trade_count = t.trade_count + added.n,
+        active_markets = t.active_markets + COALESCE(new_markets.n, 0),
+        trade_volume = t.trade_volume + added.volume
+    FROM added
+    LEFT JOIN new_markets USING (trader_id)
+    WHERE t.id = added.trader_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trader_trades_counters_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE trader_markets m
+    SET trades = m.trades - r.n
+    FROM (
+        SELECT trader_id, market_slug, count(*) AS n
+        FROM old_rows
+        WHERE market_slug IS NOT NULL
+        GROUP BY trader_id, market_slug
+    ) AS r
+    WHERE m.trader_id = r.trader_id AND m.market_slug = r.market_slug;
+
+    WITH emptied AS (
+        DELETE FROM trader_markets WHERE trades <= 0 RETURNING trader_id
+    ),
+    lost_markets AS (
+        SELECT trader_id, count(*) AS n FROM emptied GROUP BY trader_id
+    ),
+    removed AS (
+        SELECT trader_id, count(*) AS n, COALESCE(sum(size * price), 0) AS volume
+        FROM old_rows
+        GROUP BY trader_id
+    )
+    UPDATE tracked_traders t
+    SET trade_count = GREATEST(t.trade_count - removed.n, 0),
+        active_markets = GREATEST(t.active_markets - COALESCE(lost_markets.n, 0), 0),
+        trade_volume = GREATEST(t.trade_volume - removed.volume, 0)
+    FROM removed
+    LEFT JOIN lost_markets USING (trader_id)
+    WHERE t.id = removed.trader_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trader_trades_counters_insert
+    AFTER INSERT ON trader_trades
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trader_trades_counters_insert();
+
+CREATE TRIGGER trader_trades_counters_delete
+    AFTER DELETE ON trader_trades
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trader_trades_counters_delete();
+
+-- Rebuild the counters from trader_trades; returns the number of traders that had drifted
+CREATE OR REPLACE FUNCTION reconcile_trader_counters()
+RETURNS INTEGER AS $$
+DECLARE
+    fixed INTEGER;
+BEGIN
+    -- WHERE true: PostgREST sessions load pg_safeupdate, which rejects unqualified DELETEs
+    DELETE FROM trader_markets WHERE true;
+    INSERT INTO trader_markets (trader_id, market_slug, trades)
+    SELECT trader_id, market_slug, count(*)
+    FROM trader_trades
+    WHERE market_slug IS NOT NULL
+    GROUP BY trader_id, market_slug;
+
+    WITH actual AS (
+        SELECT t.id,
+               count(tt.id)::INTEGER AS trade_count,
+               count(DISTINCT tt.market_slug)::INTEGER AS active_markets,
+               COALESCE(sum(tt.size * tt.price), 0) AS trade_volume
+        FROM tracked_traders t
+        LEFT JOIN trader_trades tt ON tt.trader_id = t.id
+        GROUP BY t.id
+    )
+    UPDATE tracked_traders t
+    SET trade_count = actual.trade_count,
+        active_markets = actual.active_markets,
+        trade_volume = actual.trade_volume
+    FROM actual
+    WHERE t.id = actual.id
+      AND (t.trade_count <> actual.trade_count
+           OR t.active_markets <> actual.active_markets
+           OR abs(t.trade_volume - actual.trade_volume) > 1e-6);
+    GET DIAGNOSTICS fixed = ROW_COUNT;
+    RETURN fixed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Watchlist-wide totals from the counters, without touching trader_trades
+CREATE OR REPLACE FUNCTION trader_stats_summary()
+RETURNS TABLE (
+    total_tracked BIGINT,
+    total_trades BIGINT,
+    avg_pnl DOUBLE PRECISION,
+    top_trader TEXT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        count(*),
+        COALESCE(sum(trade_count), 0)::BIGINT,
+        COALESCE(avg(pnl) FILTER (WHERE pnl <> 0), 0),
+        (
+            SELECT COALESCE(username, id::TEXT)
+            FROM tracked_traders
+            ORDER BY pnl DESC NULLS LAST
+            LIMIT 1
+        )
+    FROM tracked_traders;
+$$;
+
+SELECT reconcile_trader_counters();
@@ -0,0 +1,3 @@
+-- Last cascade skip per market, so skipped markets leave the pending-prediction queue
+ALTER TABLE markets ADD COLUMN IF NOT EXISTS cascade_skipped_at TIMESTAMPTZ;
+ALTER TABLE markets ADD COLUMN IF NOT EXISTS cascade_skip_reason TEXT;
@@ -0,0 +1,5 @@
+-- Leaderboard stats mirrored by the trader scanner, kept apart from the
+-- positions-derived pnl/volume that the profile refresh writes
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS leaderboard_pnl DOUBLE PRECISION;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS leaderboard_volume DOUBLE PRECISION;
+ALTER TABLE tracked_traders ADD COLUMN IF NOT EXISTS leaderboard_period TEXT;